@@ -0,0 +1,228 @@
+# Kütüphane Yönetim Sistemi - Kiralama Analizleri
+# Kitap, yazar ve üye bazında günlük/aylık kiralama kovaları - Kiralama ve teslimde artırılır
+# Popülerlik, trend ve aylık raporlar her istekte tüm kiralamaları taramak yerine kovaları toplar
+
+from sqlalchemy import String, and_, cast, delete, func, insert as sql_insert, literal, or_, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+
+from models import Kitap, Uye, Kiralama, KiralamaArsiv, KiralamaKovasi
+import counters
+
+# Günlük kovalar bu kadar gün saklanır - Daha eski pencereler ay kovalarından (ay hassasiyetinde) okunur
+GUNLUK_SAKLAMA_GUN = int(os.getenv("ANALIZ_GUNLUK_SAKLAMA_GUN", "400"))
+
+# Periyot -> kova anahtarı biçimi
+PERIYOTLAR = {"gun": "%Y-%m-%d", "ay": "%Y-%m"}
+# Popülerlik boyutları - "toplam" boyutu trend için tek satır tutar
+BOYUTLAR = ("kitap", "yazar", "uye")
+TOPLAM = "toplam"
+
+def _kovalari_artir(db: Session, anahtarlar: Dict[str, str], tarih: datetime, kiralama: int = 0, teslim: int = 0):
+    """Verilen boyut anahtarlarının gün ve ay kovalarını tek çok satırlı UPSERT ile artır"""
+    satirlar = [
+        {
+            "boyut": boyut, "periyot": periyot, "kova": tarih.strftime(bicim),
+            "anahtar": anahtar, "kiralama": kiralama, "teslim": teslim,
+        }
+        for periyot, bicim in PERIYOTLAR.items()
+        for boyut, anahtar in {**anahtarlar, TOPLAM: ""}.items()
+        if anahtar is not None
+    ]
+    stmt = insert(KiralamaKovasi).values(satirlar)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[KiralamaKovasi.boyut, KiralamaKovasi.periyot, KiralamaKovasi.kova, KiralamaKovasi.anahtar],
+        set_={
+            "kiralama": KiralamaKovasi.kiralama + stmt.excluded.kiralama,
+            "teslim": KiralamaKovasi.teslim + stmt.excluded.teslim,
+        }
+    )
+    db.execute(stmt)
+
+# Olay bazlı güncellemeler - Endpoint'ler commit'ten önce çağırır, sayaçlarla aynı transaction
+def kitap_kiralandi(db: Session, kitap_id: int, yazar: Optional[str], uye_id: int, tarih: Optional[datetime] = None):
+    _kovalari_artir(db, {"kitap": str(kitap_id), "yazar": yazar, "uye": str(uye_id)}, tarih or datetime.utcnow(), kiralama=1)
+
+def kitap_teslim_edildi(db: Session, kitap_id: int, yazar: Optional[str], uye_id: int, tarih: Optional[datetime] = None):
+    _kovalari_artir(db, {"kitap": str(kitap_id), "yazar": yazar, "uye": str(uye_id)}, tarih or datetime.utcnow(), teslim=1)
+
+# Pencere sorguları - Tam aylar ay kovasından, kenardaki kısmi aylar gün kovalarından okunur
+def pencere(gun: int = 30, baslangic: Optional[date] = None, bitis: Optional[date] = None) -> Tuple[date, date]:
+    """Rapor penceresi - Varsayılan: bugünle biten son `gun` gün (her iki uç dahil)"""
+    bitis = bitis or datetime.utcnow().date()
+    baslangic = baslangic or bitis - timedelta(days=gun - 1)
+    if baslangic > bitis:
+        raise ValueError("Başlangıç tarihi bitiş tarihinden sonra olamaz")
+    return baslangic, bitis
+
+def _ay_sonu(ay: date) -> date:
+    return (ay.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+def _pencere_kosulu(baslangic: date, bitis: date):
+    """Pencereyi en az sayıda kovayla kapla - En fazla iki gün aralığı + aradaki ay kovaları
+
+    Günlük kovası silinmiş eski kısmi aylar ay kovasıyla (ay başına yuvarlanarak) sayılır.
+    """
+    gunluk_sinir = datetime.utcnow().date() - timedelta(days=GUNLUK_SAKLAMA_GUN)
+    aylar, kosullar = [], []
+    ay = baslangic.replace(day=1)
+    while ay <= bitis:
+        ay_sonu = _ay_sonu(ay)
+        parca_bas, parca_bit = max(ay, baslangic), min(ay_sonu, bitis)
+        if (parca_bas == ay and parca_bit == ay_sonu) or parca_bas < gunluk_sinir:
+            aylar.append(ay.strftime("%Y-%m"))
+        else:
+            kosullar.append(and_(
+                KiralamaKovasi.periyot == "gun",
+                KiralamaKovasi.kova.between(parca_bas.isoformat(), parca_bit.isoformat())
+            ))
+        ay = ay_sonu + timedelta(days=1)
+    if aylar:
+        kosullar.append(and_(KiralamaKovasi.periyot == "ay", KiralamaKovasi.kova.in_(aylar)))
+    return or_(*kosullar)
+
+def populer(db: Session, boyut: str, baslangic: date, bitis: date, limit: int = 5) -> List[Dict]:
+    """Penceredeki en çok kiralanan kitap/yazar/üyeler - Kovalar anahtar bazında toplanır"""
+    toplam = func.sum(KiralamaKovasi.kiralama).label("kiralama")
+    satirlar = db.execute(
+        select(KiralamaKovasi.anahtar, toplam)
+        .where(KiralamaKovasi.boyut == boyut, _pencere_kosulu(baslangic, bitis))
+        .group_by(KiralamaKovasi.anahtar)
+        .having(toplam > 0)
+        .order_by(toplam.desc(), KiralamaKovasi.anahtar)
+        .limit(limit)
+    ).all()
+
+    if boyut == "yazar":
+        return [{"yazar": anahtar, "kiralama": sayi} for anahtar, sayi in satirlar]
+
+    # Başlık ve üye adları tek sorguda - Silinmiş kayıtlar None kalır
+    idler = [int(anahtar) for anahtar, _ in satirlar]
+    if boyut == "kitap":
+        kitaplar = {k.id: k for k in db.execute(select(Kitap.id, Kitap.baslik, Kitap.yazar).where(Kitap.id.in_(idler)))}
+        return [
+            {
+                "kitap_id": kitap_id,
+                "baslik": kitaplar[kitap_id].baslik if kitap_id in kitaplar else None,
+                "yazar": kitaplar[kitap_id].yazar if kitap_id in kitaplar else None,
+                "kiralama": sayi,
+            }
+            for kitap_id, (_, sayi) in zip(idler, satirlar)
+        ]
+
+    uyeler = {u.id: f"{u.ad} {u.soyad}" for u in db.execute(select(Uye.id, Uye.ad, Uye.soyad).where(Uye.id.in_(idler)))}
+    return [{"uye_id": uye_id, "ad_soyad": uyeler.get(uye_id), "kiralama": sayi} for uye_id, (_, sayi) in zip(idler, satirlar)]
+
+def trend(db: Session, baslangic: date, bitis: date, periyot: str = "gun") -> List[Dict]:
+    """Penceredeki her gün/ay için toplam kiralama ve teslim - Boş kovalar 0 ile doldurulur"""
+    bicim = PERIYOTLAR[periyot]
+    degerler = {
+        kova: (kiralama, teslim)
+        for kova, kiralama, teslim in db.execute(
+            select(KiralamaKovasi.kova, KiralamaKovasi.kiralama, KiralamaKovasi.teslim)
+            .where(
+                KiralamaKovasi.boyut == TOPLAM,
+                KiralamaKovasi.anahtar == "",
+                KiralamaKovasi.periyot == periyot,
+                KiralamaKovasi.kova.between(baslangic.strftime(bicim), bitis.strftime(bicim))
+            )
+        )
+    }
+
+    noktalar, tarih = [], baslangic
+    while tarih <= bitis:
+        kova = tarih.strftime(bicim)
+        kiralama, teslim = degerler.get(kova, (0, 0))
+        noktalar.append({"kova": kova, "kiralama": kiralama, "teslim": teslim})
+        tarih = tarih + timedelta(days=1) if periyot == "gun" else _ay_sonu(tarih) + timedelta(days=1)
+    return noktalar
+
+def aylik_rapor(db: Session, ay: date, limit: int = 5) -> Dict:
+    """Bir ayın özeti - Aylık sayaçlar ve o ayın en popüler kitap/yazar/üyeleri"""
+    ay = ay.replace(day=1)
+    onekler = (counters.YENI_KITAP, counters.YENI_UYE, counters.KIRALAMA, counters.TESLIM)
+    anahtarlar = {onek: counters.ay_anahtari(onek, ay) for onek in onekler}
+    degerler = counters.sayaclari_getir(db, anahtarlar.values())
+    return {
+        "ay": ay.strftime("%Y-%m"),
+        **{onek: degerler[anahtar] for onek, anahtar in anahtarlar.items()},
+        "populer": {boyut: populer(db, boyut, ay, _ay_sonu(ay), limit) for boyut in BOYUTLAR},
+    }
+
+# Bakım - Eski günlük kovaları silme ve kaynak tablolardan yeniden oluşturma
+def eski_kovalari_temizle(db: Session) -> int:
+    """Saklama süresini aşan günlük kovaları sil - Ay kovaları kalıcıdır"""
+    sinir = (datetime.utcnow().date() - timedelta(days=GUNLUK_SAKLAMA_GUN)).isoformat()
+    sonuc = db.execute(delete(KiralamaKovasi).where(KiralamaKovasi.periyot == "gun", KiralamaKovasi.kova < sinir))
+    db.commit()
+    return sonuc.rowcount
+
+def kovalari_yeniden_olustur(db: Session):
+    """Tüm kovaları aktif ve arşivlenmiş kiralamalardan set tabanlı INSERT ... SELECT ile yeniden oluştur
+
+    Yazar kovaları kitabın güncel yazarıyla oluşur; silinmiş kitapların yazar kovası oluşmaz.
+    """
+    # Her kiralama bir kiralama satırı, teslim edilmişse ayrıca bir teslim satırı üretir
+    olaylar = union_all(*[
+        select(
+            tablo.kitap_id, tablo.uye_id, tarih_kolonu.label("tarih"),
+            literal(int(tur == "kiralama")).label("kiralama"), literal(int(tur == "teslim")).label("teslim")
+        ).where(tarih_kolonu.isnot(None))
+        for tablo in (Kiralama, KiralamaArsiv)
+        for tur, tarih_kolonu in (("kiralama", tablo.kiralama_tarihi), ("teslim", tablo.teslim_tarihi))
+    ]).subquery()
+    kaynak = olaylar.outerjoin(Kitap, Kitap.id == olaylar.c.kitap_id)
+
+    anahtar_ifadeleri = {
+        "kitap": cast(olaylar.c.kitap_id, String),
+        "yazar": Kitap.yazar,
+        "uye": cast(olaylar.c.uye_id, String),
+        TOPLAM: literal(""),
+    }
+    gunluk_sinir = (datetime.utcnow().date() - timedelta(days=GUNLUK_SAKLAMA_GUN)).isoformat()
+
+    db.execute(delete(KiralamaKovasi))
+    for periyot, bicim in PERIYOTLAR.items():
+        kova = func.strftime(bicim, olaylar.c.tarih)
+        for boyut, anahtar in anahtar_ifadeleri.items():
+            sorgu = (
+                select(
+                    literal(boyut), literal(periyot), kova, anahtar,
+                    func.sum(olaylar.c.kiralama), func.sum(olaylar.c.teslim)
+                )
+                .select_from(kaynak)
+                .where(anahtar.isnot(None))
+                .group_by(kova, anahtar)
+            )
+            if periyot == "gun":
+                sorgu = sorgu.where(kova >= gunluk_sinir)
+            db.execute(sql_insert(KiralamaKovasi).from_select(
+                ["boyut", "periyot", "kova", "anahtar", "kiralama", "teslim"], sorgu
+            ))
+    db.commit()
+
+def kovalari_uzlastir(db: Session, duzelt: bool = True) -> Dict:
+    """Ay kovalarının toplamını kaynak tablolarla karşılaştır - Fark varsa (örn. eski veritabanı) yeniden oluştur"""
+    kova_toplami = db.execute(
+        select(func.coalesce(func.sum(KiralamaKovasi.kiralama), 0), func.coalesce(func.sum(KiralamaKovasi.teslim), 0))
+        .where(KiralamaKovasi.boyut == TOPLAM, KiralamaKovasi.periyot == "ay")
+    ).one()
+    gercek = tuple(
+        sum(db.scalar(select(func.count()).select_from(tablo).where(kolon.isnot(None))) for tablo, kolon in kaynaklar)
+        for kaynaklar in (
+            ((Kiralama, Kiralama.kiralama_tarihi), (KiralamaArsiv, KiralamaArsiv.kiralama_tarihi)),
+            ((Kiralama, Kiralama.teslim_tarihi), (KiralamaArsiv, KiralamaArsiv.teslim_tarihi)),
+        )
+    )
+
+    uyusmuyor = tuple(kova_toplami) != gercek
+    if uyusmuyor and duzelt:
+        kovalari_yeniden_olustur(db)
+        logging.warning(f"Analiz kovaları yeniden oluşturuldu: kova toplamı {tuple(kova_toplami)}, gerçek {gercek}")
+    return {"kova": {"kiralama": kova_toplami[0], "teslim": kova_toplami[1]},
+            "gercek": {"kiralama": gercek[0], "teslim": gercek[1]},
+            "duzeltildi": uyusmuyor and duzelt}
@@ -0,0 +1,137 @@
+# Kütüphane Yönetim Sistemi - Kiralama Arşivi
+# Teslim edilmiş eski kiralamaları sıcak kiralamalar tablosundan kiralamalar_arsiv tablosuna taşır
+# Parti parti çalışır, her parti kendi transaction'ında - Yazma kilitleri kısa tutulur
+
+from sqlalchemy import delete, func, insert, literal, literal_column, select, union_all
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import os
+
+from models import Kitap, Uye, Kiralama, KiralamaArsiv
+from cache import invalidate_kiralama_cache
+import analytics
+import counters
+
+# Arşiv ayarları - Ortam değişkenleri ile değiştirilebilir
+ARSIV_YASI_GUN = int(os.getenv("KIRALAMA_ARSIV_YASI_GUN", "180"))  # Teslimden bu kadar gün sonra arşivlenir
+ARSIV_PARTI_BOYUTU = int(os.getenv("KIRALAMA_ARSIV_PARTI_BOYUTU", "500"))
+ARSIV_ARALIGI = 24 * 60 * 60  # saniye - Periyodik arşiv işi günde bir çalışır
+ARSIV_ILK_GECIKME = 60  # saniye - İlk tur worker açılışıyla yarışmasın
+
+# Kiralama kolonları - Arşiv tablosu aynı kolonları aynı isimlerle taşır
+KIRALAMA_KOLONLARI = [kolon.name for kolon in Kiralama.__table__.columns]
+
+def kiralamalari_arsivle(db: Session, gun: int = ARSIV_YASI_GUN, parti_boyutu: int = ARSIV_PARTI_BOYUTU) -> Dict:
+    """Teslim tarihi `gun` günden eski kiralamaları arşive taşı - Her parti ayrı commit edilir"""
+    sinir = datetime.utcnow() - timedelta(days=gun)
+    # En büyük id'li satır bırakılır - SQLite AUTOINCREMENT olmadan silinen en büyük id'yi yeniden kullanır
+    en_buyuk_id = db.scalar(select(func.max(Kiralama.id))) or 0
+    tasinan = 0
+    parti_sayisi = 0
+
+    while True:
+        idler = db.scalars(
+            select(Kiralama.id)
+            .where(
+                Kiralama.durum == "teslim_edildi",
+                Kiralama.teslim_tarihi < sinir,
+                Kiralama.id < en_buyuk_id
+            )
+            .order_by(Kiralama.id)
+            .limit(parti_boyutu)
+        ).all()
+        if not idler:
+            break
+
+        # INSERT ... SELECT + DELETE aynı transaction'da - Satır ya sıcak tabloda ya arşivde
+        kaynak = select(
+            *[Kiralama.__table__.c[kolon] for kolon in KIRALAMA_KOLONLARI],
+            literal(datetime.utcnow()).label("arsivlenme_tarihi")
+        ).where(Kiralama.id.in_(idler))
+        db.execute(insert(KiralamaArsiv).from_select(KIRALAMA_KOLONLARI + ["arsivlenme_tarihi"], kaynak))
+        db.execute(delete(Kiralama).where(Kiralama.id.in_(idler)).execution_options(synchronize_session=False))
+        counters.surum_artir(db, "kiralamalar")
+        db.commit()
+
+        tasinan += len(idler)
+        parti_sayisi += 1
+
+    if tasinan:
+        logging.info(f"Kiralama arşivi: {tasinan} kayıt {parti_sayisi} partide arşivlendi")
+    return {"arsivlenen": tasinan, "parti_sayisi": parti_sayisi, "sinir_tarihi": sinir.isoformat()}
+
+async def arsiv_isi(session_factory, gun: int = ARSIV_YASI_GUN, parti_boyutu: int = ARSIV_PARTI_BOYUTU) -> Dict:
+    """Arşiv işini thread pool'da çalıştır ve kiralama cache'ini temizle - Süresi dolan günlük analiz kovaları da silinir"""
+    def calistir():
+        with session_factory() as db:
+            sonuc = kiralamalari_arsivle(db, gun, parti_boyutu)
+            sonuc["silinen_gunluk_kova"] = analytics.eski_kovalari_temizle(db)
+            return sonuc
+
+    sonuc = await run_in_threadpool(calistir)
+    if sonuc["arsivlenen"]:
+        await invalidate_kiralama_cache()
+    return sonuc
+
+async def arsiv_dongusu(session_factory, aralik: int = ARSIV_ARALIGI, ilk_gecikme: int = ARSIV_ILK_GECIKME):
+    """Periyodik arşiv işi - Hata olursa loglayıp bir sonraki turu bekler"""
+    await asyncio.sleep(ilk_gecikme)
+    while True:
+        try:
+            await arsiv_isi(session_factory)
+        except Exception as e:
+            logging.error(f"Kiralama arşivleme hatası: {e}")
+        await asyncio.sleep(aralik)
+
+def kiralama_gecmisi(
+    db: Session,
+    uye_id: Optional[int] = None,
+    kitap_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[Dict]:
+    """Aktif ve arşivlenmiş kiralamaları tek listede döndür - En yeni kiralama önce"""
+    def kaynak(tablo, arsivlendi: bool):
+        sorgu = select(*[tablo.c[kolon] for kolon in KIRALAMA_KOLONLARI], literal_column(str(int(arsivlendi))).label("arsivlendi"))
+        if uye_id is not None:
+            sorgu = sorgu.where(tablo.c.uye_id == uye_id)
+        if kitap_id is not None:
+            sorgu = sorgu.where(tablo.c.kitap_id == kitap_id)
+        return sorgu
+
+    birlesik = union_all(
+        kaynak(Kiralama.__table__, False),
+        kaynak(KiralamaArsiv.__table__, True)
+    ).subquery()
+    satirlar = db.execute(
+        select(birlesik)
+        .order_by(birlesik.c.kiralama_tarihi.desc(), birlesik.c.id.desc())
+        .offset(skip)
+        .limit(limit)
+    ).mappings().all()
+
+    # Kitap ve üyeleri sayfa başına iki sorguda yükle - Silinmiş kayıtlar None kalır
+    kitaplar = {k.id: k for k in db.query(Kitap).filter(Kitap.id.in_({s["kitap_id"] for s in satirlar}))}
+    uyeler = {u.id: u for u in db.query(Uye).filter(Uye.id.in_({s["uye_id"] for s in satirlar}))}
+
+    return [
+        {
+            **satir,
+            "arsivlendi": bool(satir["arsivlendi"]),
+            "kitap": kitaplar.get(satir["kitap_id"]),
+            "uye": uyeler.get(satir["uye_id"]),
+        }
+        for satir in satirlar
+    ]
+
+def arsiv_istatistikleri(db: Session) -> Dict:
+    """Sıcak tablo ve arşiv boyutları"""
+    return {
+        "aktif_tablo": db.scalar(select(func.count(Kiralama.id))),
+        "arsiv": db.scalar(select(func.count(KiralamaArsiv.id))),
+        "arsiv_yasi_gun": ARSIV_YASI_GUN,
+    }
@@ -0,0 +1,134 @@
+# Kütüphane Yönetim Sistemi - Müsaitlik İndeksi
+# Kitap.id ile adreslenen süreç içi bit dizisi - "Bu kitap şu an kiralanabilir mi?" O(1)
+# "surum:kitaplar" sayacıyla eşlenir - Başka bir worker kitap yazdıysa indeks güncel sayılmaz
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from threading import Lock
+from typing import Dict, List, Optional
+import logging
+
+from models import Kitap
+import counters
+
+# Kitap müsaitliğini değiştiren her yazma (ekleme, güncelleme, silme, kiralama, teslim) bu sürümü artırır
+SURUM_ANAHTARI = f"{counters.SURUM}:kitaplar"
+
+class MusaitlikIndeksi:
+    """Kitap başına 2 bit: kayıt var mı + kiralanabilir mi
+
+    Bellek: her bit dizisi en büyük id / 8 byte - 1M kitapta 2 x 125 KB = 250 KB
+    (aynı bilgi için Python set'i ~60 MB tutar). Veritabanı her zaman asıl kaynaktır.
+
+    İndeks yansıttığı kitaplar sürümünü saklar. Bu worker'ın yazmaları sürümü birer artırır ve
+    indeks eşlenmiş kalır; başka bir worker yazdığında sürüm atlar ve indeks güncel sayılmaz.
+    Güncel olmayan indeks ret kararı vermez (kiralama koşullu UPDATE'e düşer), liste için yeniden yüklenir.
+    """
+
+    def __init__(self):
+        self._var = bytearray()
+        self._musait = bytearray()
+        self._kilit = Lock()
+        self.yuklendi = False
+        self.surum: Optional[int] = None  # İndeksin yansıttığı kitaplar sürümü
+        self.yeniden_yukleme = 0
+
+    def _veritabani_surumu(self, db: Session) -> int:
+        return counters.sayaclari_getir(db, [SURUM_ANAHTARI])[SURUM_ANAHTARI]
+
+    def guncel_mi(self, db: Session) -> bool:
+        """İndeks veritabanıyla eşlenmiş mi - Birincil anahtar ile tek sayaç okuması"""
+        return self.yuklendi and self.surum == self._veritabani_surumu(db)
+
+    def hazirla(self, db: Session) -> "MusaitlikIndeksi":
+        """Read-through - İndeks yüklenmemişse veya başka bir worker kitap yazdıysa veritabanından doldur"""
+        if not self.guncel_mi(db):
+            if self.yuklendi:
+                self.yeniden_yukleme += 1
+            self.yukle(db)
+        return self
+
+    def yukle(self, db: Session):
+        """Tüm kitapların durumunu tek sorguda yükle - (id, kiralanabilir) satırları
+
+        Sürüm satırlardan önce okunur - Arada yazma olursa indeks eski sürümle kalır ve bir sonraki kontrolde yenilenir.
+        """
+        with self._kilit:
+            surum = self._veritabani_surumu(db)
+            satirlar = db.execute(select(Kitap.id, Kitap.kiralanabilir)).all()
+            en_buyuk_id = max((kitap_id for kitap_id, _ in satirlar), default=0)
+            var = bytearray(en_buyuk_id // 8 + 1)
+            musait = bytearray(en_buyuk_id // 8 + 1)
+            for kitap_id, kiralanabilir in satirlar:
+                var[kitap_id >> 3] |= 1 << (kitap_id & 7)
+                if kiralanabilir:
+                    musait[kitap_id >> 3] |= 1 << (kitap_id & 7)
+            self._var, self._musait = var, musait
+            self.surum = surum
+            self.yuklendi = True
+        logging.info(f"Müsaitlik indeksi yüklendi: {len(satirlar)} kitap, {self.bellek_byte()} byte")
+
+    def _surumu_ilerlet(self, surum: int):
+        """Kendi yazmamızın sürümü - Sadece bir öncekinin hemen ardındaysa indeks eşlenmiş kalır"""
+        if self.surum is not None and surum == self.surum + 1:
+            self.surum = surum
+
+    def ayarla(self, kitap_id: int, kiralanabilir: bool, surum: int):
+        """Kitap eklendi veya durumu değişti - Commit'ten hemen sonra, yazmanın kitaplar sürümüyle çağrılır"""
+        if not self.yuklendi:
+            return  # İlk okumada zaten veritabanından yüklenecek
+        with self._kilit:
+            self._surumu_ilerlet(surum)
+            bayt, bit = kitap_id >> 3, 1 << (kitap_id & 7)
+            if bayt >= len(self._var):
+                ek = bytearray(bayt - len(self._var) + 1)
+                self._var += ek
+                self._musait += ek
+            self._var[bayt] |= bit
+            if kiralanabilir:
+                self._musait[bayt] |= bit
+            else:
+                self._musait[bayt] &= ~bit & 0xFF
+
+    def sil(self, kitap_id: int, surum: int):
+        """Kitap silindi - Commit'ten hemen sonra, yazmanın kitaplar sürümüyle çağrılır"""
+        if not self.yuklendi:
+            return
+        with self._kilit:
+            self._surumu_ilerlet(surum)
+            bayt, bit = kitap_id >> 3, 1 << (kitap_id & 7)
+            if bayt < len(self._var):
+                self._var[bayt] &= ~bit & 0xFF
+                self._musait[bayt] &= ~bit & 0xFF
+
+    def musait_mi(self, kitap_id: int) -> Optional[bool]:
+        """Kitap kiralanabilir mi - Kitap yoksa None"""
+        bayt, bit = kitap_id >> 3, 1 << (kitap_id & 7)
+        if kitap_id < 0 or bayt >= min(len(self._var), len(self._musait)) or not self._var[bayt] & bit:
+            return None
+        return bool(self._musait[bayt] & bit)
+
+    def musait_idler(self) -> List[int]:
+        """Kiralanabilir tüm kitap ID'leri - Boş byte'lar tek kontrolle atlanır"""
+        musait = self._musait
+        return [
+            (bayt << 3) | bit
+            for bayt in range(len(musait)) if musait[bayt]
+            for bit in range(8) if musait[bayt] >> bit & 1
+        ]
+
+    def bellek_byte(self) -> int:
+        return len(self._var) + len(self._musait)
+
+    def stats(self) -> Dict:
+        """İndeks istatistikleri"""
+        return {
+            "yuklendi": self.yuklendi,
+            "surum": self.surum,
+            "yeniden_yukleme": self.yeniden_yukleme,
+            "bellek_byte": self.bellek_byte(),
+            "musait_kitap": bin(int.from_bytes(self._musait, "little")).count("1"),
+        }
+
+# Global müsaitlik indeksi instance
+musaitlik_indeksi = MusaitlikIndeksi()
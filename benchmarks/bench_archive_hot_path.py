@@ -0,0 +1,126 @@
+# Kütüphane Yönetim Sistemi - Kiralama Arşivi Benchmark'ı
+# Teslim edilmiş geçmiş büyürken aktif yol gecikmeleri: arşivsiz ve arşivli (kiralamalar_arsiv) karşılaştırması
+# Her (mod, geçmiş boyutu) ayrı süreçte ve boş veritabanıyla ölçülür
+#
+# Kullanım: python benchmarks/bench_archive_hot_path.py [--gecmis 0 10000 50000] [--tekrar 20]
+
+from datetime import datetime, timedelta
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import ortak
+
+AKTIF_KIRALAMA = 30  # Ölçüm sırasında açık olan kiralama sayısı
+ESKI_KITAP = 20  # Geçmiş kiralamaların dağıldığı kitap/üye sayısı
+MODLAR = ("arsivsiz", "arsivli")
+
+def gecmis_olustur(adet: int):
+    """Bir-iki yıl önce teslim edilmiş `adet` kiralama - Aktif yolun hiç ihtiyaç duymadığı geçmiş"""
+    from sqlalchemy import insert, select
+    from database import SessionLocal
+    from models import Kiralama, Kitap, Uye
+
+    with SessionLocal() as db:
+        db.execute(insert(Kitap), [{"baslik": f"Eski Kitap {i}", "yazar": "Yazar"} for i in range(ESKI_KITAP)])
+        db.execute(insert(Uye), [{"ad": "Eski", "soyad": str(i), "email": f"eski{i}@x.com"} for i in range(ESKI_KITAP)])
+        kitaplar = db.scalars(select(Kitap.id)).all()
+        uyeler = db.scalars(select(Uye.id)).all()
+
+        simdi = datetime.utcnow()
+        for baslangic in range(0, adet, 10_000):
+            satirlar = []
+            for i in range(baslangic, min(baslangic + 10_000, adet)):
+                kiralama_tarihi = simdi - timedelta(days=365 + i % 365, minutes=i)
+                satirlar.append({
+                    "kitap_id": kitaplar[i % len(kitaplar)], "uye_id": uyeler[i % len(uyeler)],
+                    "kiralama_tarihi": kiralama_tarihi, "son_teslim_tarihi": kiralama_tarihi + timedelta(days=14),
+                    "teslim_tarihi": kiralama_tarihi + timedelta(days=7), "durum": "teslim_edildi",
+                })
+            db.execute(insert(Kiralama), satirlar)
+        db.commit()
+
+def tek_olcum(mod: str, gecmis: int, tekrar: int) -> dict:
+    """Tek bir veritabanında geçmişi oluştur, (istenirse) arşivle ve aktif yolu ölç"""
+    klasor = ortak.gecici_ortam("arsiv")
+    ortak.uygulama_ayarla(klasor)
+
+    import asyncio
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+    import archive
+    import main
+    from cache import invalidate_kiralama_cache
+    from database import SessionLocal
+    from models import Kiralama
+
+    with TestClient(main.app) as client:
+        gecmis_olustur(gecmis)
+        if mod == "arsivli":
+            with SessionLocal() as db:
+                archive.kiralamalari_arsivle(db)
+
+        son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+        def kiralama_ac(i):
+            kitap = client.post("/api/kitaplar", json={"baslik": f"Aktif Kitap {i}", "yazar": "Yazar"}).json()
+            uye = client.post("/api/uyeler", json={"ad": "Aktif", "soyad": str(i), "email": f"aktif{i}@x.com"}).json()
+            yanit = client.post("/api/kiralamalar", json={"kitap_id": kitap["id"], "uye_id": uye["id"], "son_teslim_tarihi": son_teslim})
+            return kitap["id"], uye["id"], yanit.json()["id"]
+        acik = [kiralama_ac(i) for i in range(AKTIF_KIRALAMA)]
+
+        # Döngü kitabı - Her turda kiralanıp teslim edilir
+        dongu_kitap, dongu_uye, dongu_kiralama = acik.pop()
+        client.put(f"/api/kiralamalar/{dongu_kiralama}/teslim")
+
+        def kirala_teslim():
+            yanit = client.post("/api/kiralamalar", json={"kitap_id": dongu_kitap, "uye_id": dongu_uye, "son_teslim_tarihi": son_teslim})
+            assert yanit.status_code == 200, yanit.text
+            client.put(f"/api/kiralamalar/{yanit.json()['id']}/teslim")
+
+        def tam_liste():
+            asyncio.run(invalidate_kiralama_cache())  # Redis çalışıyorsa bile her ölçüm veritabanına gitsin
+            assert client.get("/api/kiralamalar").status_code == 200
+
+        with SessionLocal() as db:
+            sicak_tablo = db.scalar(select(func.count(Kiralama.id)))
+
+        return {
+            "mod": mod,
+            "gecmis": gecmis,
+            "sicak_tablo": sicak_tablo,
+            "kirala_teslim_ms": ortak.medyan_ms(kirala_teslim, tekrar),
+            "arama_ms": ortak.medyan_ms(lambda: client.get("/api/kiralamalar", params={"q": "Aktif", "limit": 20}), tekrar),
+            "tam_liste_ms": ortak.medyan_ms(tam_liste, max(3, tekrar // 5)),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Geçmiş büyürken aktif kiralama yolunun gecikmesi")
+    parser.add_argument("--gecmis", type=int, nargs="+", default=[0, 10_000, 50_000], help="Geçmiş kiralama sayıları")
+    parser.add_argument("--tekrar", type=int, default=20, help="İşlem başına ölçüm sayısı (medyan alınır)")
+    parser.add_argument("--tek", nargs=2, metavar=("MOD", "GECMIS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.tek:
+        print("SONUC " + json.dumps(tek_olcum(args.tek[0], int(args.tek[1]), args.tekrar)))
+        return
+
+    print(f"{'mod':<9} {'geçmiş':>8} {'sıcak tablo':>12} {'kirala+teslim':>14} {'arama':>9} {'tam liste':>10}")
+    for gecmis in args.gecmis:
+        for mod in MODLAR:
+            ortam = {**os.environ, "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp(prefix='kutuphane_arsiv_')}/bench.db"}
+            cikti = subprocess.run(
+                [sys.executable, __file__, "--tek", mod, str(gecmis), "--tekrar", str(args.tekrar)],
+                env=ortam, capture_output=True, text=True, check=True
+            ).stdout
+            s = json.loads(next(satir for satir in cikti.splitlines() if satir.startswith("SONUC "))[6:])
+            print(
+                f"{s['mod']:<9} {s['gecmis']:>8} {s['sicak_tablo']:>12} {s['kirala_teslim_ms']:>11.1f} ms"
+                f" {s['arama_ms']:>6.1f} ms {s['tam_liste_ms']:>7.1f} ms",
+                flush=True
+            )
+
+if __name__ == "__main__":
+    main()
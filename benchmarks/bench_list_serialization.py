@@ -0,0 +1,88 @@
+# Kütüphane Yönetim Sistemi - Liste Serileştirme Benchmark'ı
+# Tam kitap listesi: ORM nesneleri (.all() + liste_json) ile Core satırları (yield_per + satirlardan_json)
+# tracemalloc ile tepe bellek, ayrıca izleme olmadan süre ölçülür
+#
+# Kullanım: python benchmarks/bench_list_serialization.py [--kitap 100000] [--tekrar 2]
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import ortak
+
+def kitaplari_olustur(adet: int):
+    from sqlalchemy import insert
+    from database import SessionLocal, create_tables
+    from models import Kitap
+
+    create_tables()
+    with SessionLocal() as db:
+        for baslangic in range(0, adet, 5000):
+            db.execute(insert(Kitap), [
+                {
+                    "baslik": f"Kitap {i}", "yazar": "Yazar Adı Soyadı", "yayin_evi": "Yayınevi",
+                    "yayin_yili": 2000, "isbn": f"978-{i}", "sayfa_sayisi": 300,
+                    "aciklama": "Kısa açıklama metni " * 5,
+                }
+                for i in range(baslangic, min(baslangic + 5000, adet))
+            ])
+        db.commit()
+
+def orm_yolu() -> bytes:
+    """user-037 öncesi - Her satır bir Kitap nesnesi, hepsi identity map'te"""
+    from database import SessionLocal
+    from models import Kitap
+    from responses import liste_json
+    from schemas import Kitap as KitapSchema
+
+    with SessionLocal() as db:
+        return liste_json(KitapSchema, db.query(Kitap).all())
+
+def core_yolu() -> bytes:
+    """Şu anki yol - Şema kolonları Core satırı olarak, OKUMA_PARTISI'lık partiler halinde"""
+    from database import SessionLocal
+    from main import OKUMA_PARTISI, _kitap_sorgusu
+    from responses import satirlardan_json
+    from schemas import Kitap as KitapSchema
+
+    with SessionLocal() as db:
+        return satirlardan_json(KitapSchema, db.execute(_kitap_sorgusu().execution_options(yield_per=OKUMA_PARTISI)))
+
+def olc(islem, tekrar: int):
+    """(tepe bellek MB, izlemesiz en iyi süre sn, gövde boyutu MB)"""
+    gc.collect()
+    tracemalloc.start()
+    govde = islem()
+    tepe = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    sureler = []
+    for _ in range(tekrar):
+        gc.collect()
+        baslangic = time.perf_counter()
+        islem()
+        sureler.append(time.perf_counter() - baslangic)
+    return tepe / 1e6, min(sureler), len(govde) / 1e6, govde
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM ve Core/yield_per liste serileştirme karşılaştırması")
+    parser.add_argument("--kitap", type=int, default=100_000, help="Oluşturulacak kitap sayısı")
+    parser.add_argument("--tekrar", type=int, default=2, help="Süre ölçümü tekrar sayısı (en iyisi alınır)")
+    args = parser.parse_args()
+
+    ortak.gecici_ortam("liste")
+    kitaplari_olustur(args.kitap)
+
+    sonuclar = {ad: olc(islem, args.tekrar) for ad, islem in (("ORM .all()", orm_yolu), ("Core yield_per", core_yolu))}
+    print(f"{args.kitap} kitap")
+    print(f"{'yol':<16} {'tepe bellek':>12} {'süre':>8} {'gövde':>8}")
+    for ad, (tepe, sure, boyut, _) in sonuclar.items():
+        print(f"{ad:<16} {tepe:>9.1f} MB {sure:>6.2f} s {boyut:>5.1f} MB")
+
+    (orm_tepe, _, _, orm_govde), (core_tepe, _, _, core_govde) = sonuclar.values()
+    assert orm_govde == core_govde, "İki yol farklı JSON üretti"
+    assert core_tepe < orm_tepe, "Core yolu ORM yolundan fazla bellek kullandı"
+
+if __name__ == "__main__":
+    main()
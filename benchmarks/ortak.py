@@ -0,0 +1,40 @@
+# Kütüphane Yönetim Sistemi - Benchmark Ortak Ayarları
+# Benchmark'lar geçici bir SQLite dosyası ve log klasörüyle çalışır - kutuphane.db'ye dokunulmaz
+# Bu modül uygulama modüllerinden önce import edilmelidir (database.py engine'i import anında kurar)
+
+from pathlib import Path
+from typing import Callable, List
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PROJE_KOKU = Path(__file__).resolve().parent.parent
+
+def gecici_ortam(ad: str) -> Path:
+    """Geçici klasör oluştur ve DATABASE_URL'i ona yönlendir - Dışarıdan verilen DATABASE_URL korunur"""
+    klasor = Path(tempfile.mkdtemp(prefix=f"kutuphane_{ad}_"))
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{klasor / 'bench.db'}")
+    os.chdir(PROJE_KOKU)  # templates/ ve static/ göreli yollarla okunur
+    sys.path.insert(0, str(PROJE_KOKU))
+    return klasor
+
+def uygulama_ayarla(klasor: Path):
+    """Logları geçici klasöre yaz, Redis yoksa cache çağrıları yeniden denemeyle beklemesin"""
+    import cache
+    import logging_config
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+
+    logging_config.log_dir = klasor / "logs"
+    cache.REDIS_AYARLARI["retry"] = Retry(NoBackoff(), 0)
+
+def medyan_ms(islem: Callable[[], object], tekrar: int) -> float:
+    """İşlemi `tekrar` kez çalıştır, medyan süreyi milisaniye olarak döndür"""
+    sureler: List[float] = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        islem()
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return statistics.median(sureler)
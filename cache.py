@@ -2,20 +2,30 @@
 # Redis ile hızlı veri erişimi ve performans optimizasyonu
 # API yanıtlarını cache'leyerek veritabanı yükünü azaltır
 
-import redis
 import json
 import asyncio
 from typing import Optional, Any
 from datetime import timedelta
 import logging
 
-# Redis bağlantısı - Cache sistemi
-redis_client = redis.Redis(
-    host='localhost',
-    port=6379,
-    db=0,
-    decode_responses=True
-)
+# Redis bağlantı ayarları - İstemciler ilk kullanımda kurulur
+REDIS_AYARLARI = {
+    'host': 'localhost',
+    'port': 6379,
+    'db': 0
+}
+_redis_istemcileri = {}
+
+def get_redis(binary: bool = False):
+    """Redis istemcisini döndür - redis modülü ve bağlantı havuzu ilk çağrıda oluşturulur
+
+    binary=True: Önceden serileştirilmiş/sıkıştırılmış yanıtlar için decode edilmeyen istemci
+    """
+    istemci = _redis_istemcileri.get(binary)
+    if istemci is None:
+        import redis  # Import anında yüklenmesin - Worker açılışını yavaşlatır
+        istemci = _redis_istemcileri[binary] = redis.Redis(**REDIS_AYARLARI, decode_responses=not binary)
+    return istemci
 
 # Cache anahtarları - Organize edilmiş cache yapısı
 CACHE_KEYS = {
@@ -31,9 +41,16 @@ class CacheManager:
     """Cache yönetimi sınıfı - Redis ile veri cache'leme"""
     
     def __init__(self):
-        self.redis = redis_client
         self.default_ttl = 300  # 5 dakika varsayılan TTL
     
+    @property
+    def redis(self):
+        return get_redis()
+    
+    @property
+    def redis_binary(self):
+        return get_redis(binary=True)
+    
     async def get(self, key: str) -> Optional[Any]:
         """Cache'den veri al - JSON formatında"""
         try:
@@ -56,6 +73,24 @@ class CacheManager:
             logging.error(f"Cache set hatası: {e}")
             return False
     
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Cache'den ham byte verisi al - Serileştirilmiş/sıkıştırılmış yanıtlar için"""
+        try:
+            return self.redis_binary.get(key)
+        except Exception as e:
+            logging.error(f"Cache get_bytes hatası: {e}")
+            return None
+    
+    async def set_bytes(self, key: str, data: bytes, ttl: int = None) -> bool:
+        """Cache'e ham byte verisi kaydet"""
+        try:
+            ttl = ttl or self.default_ttl
+            self.redis_binary.setex(key, ttl, data)
+            return True
+        except Exception as e:
+            logging.error(f"Cache set_bytes hatası: {e}")
+            return False
+    
     async def delete(self, key: str) -> bool:
         """Cache'den veri sil"""
         try:
@@ -131,6 +166,7 @@ async def invalidate_kiralama_cache():
 async def get_cache_stats():
     """Cache istatistiklerini al"""
     try:
+        redis_client = get_redis()
         info = redis_client.info()
         return {
             'connected_clients': info.get('connected_clients', 0),
@@ -0,0 +1,215 @@
+# Kütüphane Yönetim Sistemi - Sayaç Sistemi
+# Dashboard istatistikleri için önceden hesaplanmış (denormalize) sayaçlar
+# Yazma endpoint'leri ile aynı transaction içinde güncellenir, uzlaştırma işi ile doğrulanır
+
+from sqlalchemy import func, select, union_all, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+
+from models import Sayac, Kitap, Uye, Kiralama, KiralamaArsiv
+
+# Genel sayaç anahtarları - Dashboard kartları
+TOPLAM_KITAP = "toplam_kitap"
+KIRALANABILIR_KITAP = "kiralanabilir_kitap"
+TOPLAM_UYE = "toplam_uye"
+AKTIF_KIRALAMA = "aktif_kiralama"
+
+# Aylık sayaç önekleri - Anahtar formatı: "<önek>:YYYY-MM"
+YENI_KITAP = "yeni_kitap"
+YENI_UYE = "yeni_uye"
+KIRALAMA = "kiralama"
+TESLIM = "teslim"
+
+# Tablo sürüm önekleri - Anahtar formatı: "surum:<tablo>", kaynak tablodan türetilemez
+SURUM = "surum"
+
+# Açılışta uzlaştırma - Varsayılan: Sadece sayaç tablosu boşken; "1" ise her worker açılışında tam uzlaştırma
+ACILISTA_UZLASTIR = os.getenv("SAYAC_UZLASTIRMA_ACILISTA", "0") == "1"
+
+def ay_anahtari(onek: str, tarih: Optional[datetime] = None) -> str:
+    """Aylık sayaç anahtarı oluştur - örn. kiralama:2024-05"""
+    tarih = tarih or datetime.utcnow()
+    return f"{onek}:{tarih.strftime('%Y-%m')}"
+
+def sayac_artir(db: Session, anahtar: str, miktar: int = 1):
+    """Sayacı artır/azalt - Kayıt yoksa oluşturur (SQLite UPSERT), commit çağırana aittir"""
+    sayaclari_artir(db, {anahtar: miktar})
+
+def sayaclari_artir(db: Session, farklar: Dict[str, int]) -> Dict[str, int]:
+    """Birden fazla sayacı tek çok satırlı UPSERT ile artır/azalt - Yeni değerler RETURNING ile döner"""
+    farklar = {anahtar: miktar for anahtar, miktar in farklar.items() if miktar}
+    if not farklar:
+        return {}
+    stmt = insert(Sayac).values([{"anahtar": anahtar, "deger": miktar} for anahtar, miktar in farklar.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Sayac.anahtar],
+        set_={"deger": Sayac.deger + stmt.excluded.deger}
+    ).returning(Sayac.anahtar, Sayac.deger)
+    return dict(db.execute(stmt).all())
+
+def sayaclari_getir(db: Session, anahtarlar: Iterable[str]) -> Dict[str, int]:
+    """Verilen anahtarların değerlerini tek sorguda al - Olmayan sayaçlar 0 döner"""
+    anahtarlar = list(anahtarlar)
+    degerler = dict(db.execute(select(Sayac.anahtar, Sayac.deger).where(Sayac.anahtar.in_(anahtarlar))).all())
+    return {anahtar: degerler.get(anahtar, 0) for anahtar in anahtarlar}
+
+def dashboard_sayaclari(db: Session) -> Dict:
+    """Dashboard kartları ve 'Bu Ay' raporu için sayaçlar - Birincil anahtar ile O(1) okuma"""
+    genel = [TOPLAM_KITAP, KIRALANABILIR_KITAP, TOPLAM_UYE, AKTIF_KIRALAMA]
+    aylik = {onek: ay_anahtari(onek) for onek in (YENI_KITAP, YENI_UYE, KIRALAMA, TESLIM)}
+    degerler = sayaclari_getir(db, genel + list(aylik.values()))
+
+    sonuc = {anahtar: degerler[anahtar] for anahtar in genel}
+    sonuc["bu_ay"] = {onek: degerler[anahtar] for onek, anahtar in aylik.items()}
+    return sonuc
+
+def surum_artir(db: Session, *tablolar: str) -> Dict[str, int]:
+    """Tablo sürümlerini artır - Sürüme bağlı HTML fragment cache'lerini geçersiz kılar
+
+    Dönüş: tablo -> yeni sürüm (örn. müsaitlik indeksi kendi yazmasını sürümüyle işler)
+    """
+    yeni = sayaclari_artir(db, {f"{SURUM}:{tablo}": 1 for tablo in tablolar})
+    return {tablo: yeni[f"{SURUM}:{tablo}"] for tablo in tablolar}
+
+def surum_anahtari(db: Session, *tablolar: str) -> str:
+    """Verilen tabloların sürümlerinden cache anahtarı üret - örn. kitaplar=12"""
+    degerler = sayaclari_getir(db, [f"{SURUM}:{tablo}" for tablo in tablolar])
+    return ",".join(f"{tablo}={degerler[f'{SURUM}:{tablo}']}" for tablo in tablolar)
+
+# Olay bazlı güncellemeler - Endpoint'ler commit'ten önce çağırır, her olay tek UPSERT
+def kitap_eklendi(db: Session, kitap: Kitap):
+    sayaclari_artir(db, {
+        TOPLAM_KITAP: 1,
+        ay_anahtari(YENI_KITAP, kitap.olusturma_tarihi): 1,
+        KIRALANABILIR_KITAP: 0 if kitap.kiralanabilir is False else 1,
+    })
+
+def kitap_silindi(db: Session, kitap: Kitap):
+    sayaclari_artir(db, {
+        TOPLAM_KITAP: -1,
+        ay_anahtari(YENI_KITAP, kitap.olusturma_tarihi): -1,
+        KIRALANABILIR_KITAP: -1 if kitap.kiralanabilir else 0,
+    })
+
+def kitap_durumu_degisti(db: Session, kiralanabilir: bool):
+    sayac_artir(db, KIRALANABILIR_KITAP, 1 if kiralanabilir else -1)
+
+def uye_eklendi(db: Session, uye: Uye):
+    sayaclari_artir(db, {TOPLAM_UYE: 1, ay_anahtari(YENI_UYE, uye.uyelik_tarihi): 1})
+
+def uye_silindi(db: Session, uye: Uye):
+    sayaclari_artir(db, {TOPLAM_UYE: -1, ay_anahtari(YENI_UYE, uye.uyelik_tarihi): -1})
+
+def kitap_kiralandi(db: Session, uye: Uye):
+    """Kitabın kiralama_sayisi kiralama endpoint'indeki koşullu UPDATE ile artırılır"""
+    sayaclari_artir(db, {AKTIF_KIRALAMA: 1, KIRALANABILIR_KITAP: -1, ay_anahtari(KIRALAMA): 1})
+    # Satır sayacı - SQL ifadesi ile atomik artırma (read-modify-write yarışı yok)
+    uye.aktif_kiralama_sayisi = Uye.aktif_kiralama_sayisi + 1
+
+def kitap_teslim_edildi(db: Session, uye_id: int, teslim_tarihi: datetime, kitap_var: bool = True):
+    """kitap_var=False: Kitap silinmiş - Kiralanabilir kitap sayısı değişmez"""
+    sayaclari_artir(db, {
+        AKTIF_KIRALAMA: -1,
+        KIRALANABILIR_KITAP: 1 if kitap_var else 0,
+        ay_anahtari(TESLIM, teslim_tarihi): 1,
+    })
+    db.execute(
+        update(Uye)
+        .where(Uye.id == uye_id)
+        .values(aktif_kiralama_sayisi=Uye.aktif_kiralama_sayisi - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+# Uzlaştırma işi - Sayaçları kaynak tablolarla karşılaştır
+def _gercek_degerler(db: Session) -> Dict[str, int]:
+    """Sayaçların kaynak tablolardan hesaplanan gerçek değerleri"""
+    degerler = {
+        TOPLAM_KITAP: db.scalar(select(func.count(Kitap.id))),
+        KIRALANABILIR_KITAP: db.scalar(select(func.count(Kitap.id)).where(Kitap.kiralanabilir == True)),
+        TOPLAM_UYE: db.scalar(select(func.count(Uye.id))),
+        AKTIF_KIRALAMA: db.scalar(select(func.count(Kiralama.id)).where(Kiralama.durum == "aktif")),
+    }
+
+    # Aylık sayaçlar - strftime ile ay bazında gruplama, kiralamalarda arşiv de dahil
+    tum_kiralamalar = union_all(
+        select(Kiralama.kiralama_tarihi, Kiralama.teslim_tarihi),
+        select(KiralamaArsiv.kiralama_tarihi, KiralamaArsiv.teslim_tarihi)
+    ).subquery()
+    aylik_kaynaklar = [
+        (YENI_KITAP, Kitap.olusturma_tarihi),
+        (YENI_UYE, Uye.uyelik_tarihi),
+        (KIRALAMA, tum_kiralamalar.c.kiralama_tarihi),
+        (TESLIM, tum_kiralamalar.c.teslim_tarihi),
+    ]
+    for onek, kolon in aylik_kaynaklar:
+        ay = func.strftime("%Y-%m", kolon)
+        for ay_degeri, sayi in db.execute(select(ay, func.count()).where(kolon.isnot(None)).group_by(ay)):
+            degerler[f"{onek}:{ay_degeri}"] = sayi
+    return degerler
+
+def _satir_farklari(db: Session, model, sayac_kolonu, kaynak) -> List[Tuple[int, int]]:
+    """Satır sayacı kaynaktan farklı olan satırlar - (id, gerçek değer) listesi
+
+    kaynak: Sayılacak her kayıt için bir satır, sahip_id kolonu ile (kitap_id / uye_id)
+    """
+    sayilar = (
+        select(kaynak.c.sahip_id, func.count().label("sayi"))
+        .group_by(kaynak.c.sahip_id)
+        .subquery()
+    )
+    gercek = func.coalesce(sayilar.c.sayi, 0)
+    return db.execute(
+        select(model.id, gercek)
+        .outerjoin(sayilar, sayilar.c.sahip_id == model.id)
+        .where(sayac_kolonu != gercek)
+    ).all()
+
+def sayaclar_bos_mu(db: Session) -> bool:
+    """Sayaç tablosunda (sürümler hariç) hiç kayıt yok mu - Eski veritabanı veya ilk açılış"""
+    return db.scalar(
+        select(Sayac.anahtar).where(Sayac.anahtar.notlike(f"{SURUM}:%")).limit(1)
+    ) is None
+
+def sayaclari_uzlastir(db: Session, duzelt: bool = True) -> Dict:
+    """Sayaçları kaynak tablolarla karşılaştır, farkları raporla ve (istenirse) düzelt"""
+    gercek = _gercek_degerler(db)
+    kayitli = dict(db.execute(
+        select(Sayac.anahtar, Sayac.deger).where(Sayac.anahtar.notlike(f"{SURUM}:%"))
+    ).all())
+
+    farklar = {
+        anahtar: {"sayac": kayitli.get(anahtar, 0), "gercek": gercek.get(anahtar, 0)}
+        for anahtar in set(gercek) | set(kayitli)
+        if kayitli.get(anahtar, 0) != gercek.get(anahtar, 0)
+    }
+
+    # Satır sayaçları - Kiralamalar tek GROUP BY ile sayılır ve tabloya LEFT JOIN edilir (satır başına alt sorgu yok)
+    kitap_farklari = _satir_farklari(db, Kitap, Kitap.kiralama_sayisi, union_all(
+        select(Kiralama.kitap_id.label("sahip_id")),
+        select(KiralamaArsiv.kitap_id.label("sahip_id"))
+    ).subquery())
+    uye_farklari = _satir_farklari(db, Uye, Uye.aktif_kiralama_sayisi, (
+        select(Kiralama.uye_id.label("sahip_id")).where(Kiralama.durum == "aktif").subquery()
+    ))
+    kitap_farki, uye_farki = len(kitap_farklari), len(uye_farklari)
+
+    if duzelt and (farklar or kitap_farki or uye_farki):
+        sayaclari_artir(db, {anahtar: fark["gercek"] - fark["sayac"] for anahtar, fark in farklar.items()})
+        # Sadece uyuşmayan satırlar - Birincil anahtar ile toplu UPDATE (executemany)
+        if kitap_farki:
+            db.execute(update(Kitap), [{"id": id_, "kiralama_sayisi": sayi} for id_, sayi in kitap_farklari])
+        if uye_farki:
+            db.execute(update(Uye), [{"id": id_, "aktif_kiralama_sayisi": sayi} for id_, sayi in uye_farklari])
+        db.commit()
+        logging.warning(f"Sayaç uyuşmazlığı düzeltildi: {len(farklar)} sayaç, {kitap_farki} kitap, {uye_farki} üye")
+
+    return {
+        "farklar": farklar,
+        "kitap_farki": kitap_farki,
+        "uye_farki": uye_farki,
+        "duzeltildi": duzelt,
+    }
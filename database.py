@@ -2,24 +2,56 @@
 # SQLAlchemy ile SQLite veritabanı bağlantısı ve yönetimi
 # Veritabanı oturumu ve tablo oluşturma fonksiyonları
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from models import Base
 import os
 
-# SQLite veritabanı oluştur
-DATABASE_URL = "sqlite:///./kutuphane.db"
+# SQLite veritabanı oluştur - Testler ve benchmark'lar DATABASE_URL ile geçici dosya kullanır
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./kutuphane.db")
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False - Commit'ten sonra nesneler tekrar SELECT edilmeden kullanılabilir
+# Insert'lerde id ve varsayılan değerler RETURNING ile aynı ifadede döner (db.refresh gerekmez)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Veritabanı tablolarını oluştur
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
 
-# Veritabanı bağlantısı
+# Eski veritabanlarına sonradan eklenen kolonları ekle
+def add_missing_columns():
+    """create_all mevcut tablolara kolon eklemez - eksik kolon ve indeksleri ALTER TABLE ile ekle"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        # İfade indeksleri (lower(email) gibi) reflection'da görünmez - İsimler doğrudan sqlite_master'dan okunur
+        mevcut_indeksler = set(conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index'")))
+        for table in Base.metadata.sorted_tables:
+            mevcut_kolonlar = {kolon["name"] for kolon in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in mevcut_kolonlar:
+                    continue
+                kolon_tipi = column.type.compile(dialect=engine.dialect)
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {kolon_tipi}"
+                if column.server_default is not None:
+                    ddl += f" NOT NULL DEFAULT {column.server_default.arg}"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                if index.name not in mevcut_indeksler:
+                    index.create(conn)
+
+# Veritabanı bağlantısı - İstek başına tek oturum (unit of work)
 def get_db():
+    """FastAPI bağımlılığı istek içinde cache'lenir - Aynı istekteki tüm Depends(get_db) bu oturumu paylaşır
+
+    db.get() önce identity map'e bakar; aynı satır istek içinde ikinci kez SELECT edilmez.
+    Commit edilmeden biten (hata fırlatan) istekler geri alınır.
+    """
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
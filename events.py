@@ -0,0 +1,83 @@
+# Kütüphane Yönetim Sistemi - Canlı Olaylar (Server-Sent Events)
+# Süreç içi asyncio pub/sub - Yazma endpoint'leri yayınlar, /api/events abonelere iletir
+# Açık dashboard'lar polling yapmadan küçük değişiklik mesajlarıyla güncellenir
+
+from fastapi import Request
+from typing import Any, AsyncIterator, Dict, Set
+import asyncio
+import itertools
+import json
+import logging
+
+HEARTBEAT_ARALIGI = 15  # saniye - Proxy'lerin boşta bağlantıyı kapatmaması için
+KUYRUK_BOYUTU = 100  # Abone başına bekleyen en fazla mesaj
+
+class EventBroker:
+    """Süreç içi olay dağıtıcısı - Her abone için ayrı sınırlı kuyruk
+
+    Not: Olaylar sadece aynı worker'a bağlı istemcilere ulaşır.
+    """
+
+    def __init__(self, kuyruk_boyutu: int = KUYRUK_BOYUTU):
+        self.kuyruk_boyutu = kuyruk_boyutu
+        self._aboneler: Set[asyncio.Queue] = set()
+        self._sayac = itertools.count(1)
+        self.yayinlanan = 0
+        self.dusurulen = 0
+
+    def abone_ol(self) -> asyncio.Queue:
+        kuyruk = asyncio.Queue(maxsize=self.kuyruk_boyutu)
+        self._aboneler.add(kuyruk)
+        return kuyruk
+
+    def abonelikten_cik(self, kuyruk: asyncio.Queue):
+        self._aboneler.discard(kuyruk)
+
+    @property
+    def abone_var(self) -> bool:
+        """Dinleyen istemci var mı - Yoksa olay verisi hazırlamaya gerek yok"""
+        return bool(self._aboneler)
+
+    def yayinla(self, tip: str, veri: Dict[str, Any]):
+        """Olayı tüm abonelere gönder - Yavaş abonelerde en eski mesaj düşürülür, yazan taraf hiç beklemez"""
+        mesaj = _sse_formatla(next(self._sayac), tip, veri)
+        self.yayinlanan += 1
+        for kuyruk in list(self._aboneler):
+            if kuyruk.full():
+                kuyruk.get_nowait()
+                self.dusurulen += 1
+            kuyruk.put_nowait(mesaj)
+
+    async def akis(self, request: Request) -> AsyncIterator[str]:
+        """Tek bir istemci için SSE akışı - Bağlantı kopunca aboneliği kapatır"""
+        kuyruk = self.abone_ol()
+        try:
+            yield "retry: 5000\n\n"  # Bağlantı koparsa tarayıcı 5 sn sonra yeniden bağlanır
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(kuyruk.get(), timeout=HEARTBEAT_ARALIGI)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.abonelikten_cik(kuyruk)
+
+    def stats(self):
+        """Olay sistemi istatistikleri"""
+        return {
+            "abone_sayisi": len(self._aboneler),
+            "yayinlanan": self.yayinlanan,
+            "dusurulen": self.dusurulen,
+        }
+
+def _sse_formatla(olay_id: int, tip: str, veri: Dict[str, Any]) -> str:
+    try:
+        data = json.dumps(veri, ensure_ascii=False, default=str)
+    except (TypeError, ValueError) as e:
+        logging.error(f"Olay serileştirme hatası: {e}")
+        data = "{}"
+    return f"id: {olay_id}\nevent: {tip}\ndata: {data}\n\n"
+
+# Global event broker instance
+event_broker = EventBroker()
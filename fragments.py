@@ -0,0 +1,46 @@
+# Kütüphane Yönetim Sistemi - HTML Fragment Cache
+# Sunucu tarafında render edilen ilk sayfa satırlarını tablo sürümüne göre cache'ler
+# Anahtar tablo sürümünü içerdiği için yazma işlemlerinden sonra eski fragmentler kendiliğinden düşer
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+class FragmentCache:
+    """Süreç içi LRU fragment cache - Sürüm anahtarlı, açık invalidation gerektirmez"""
+
+    def __init__(self, max_boyut: int = 256):
+        self.max_boyut = max_boyut
+        self._fragmentler: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._kilit = Lock()
+        self.isabet = 0
+        self.iskalama = 0
+
+    def get_or_render(self, anahtar: Hashable, uret: Callable[[], Any]) -> Any:
+        """Fragment cache'de varsa döndür, yoksa üret ve kaydet"""
+        with self._kilit:
+            if anahtar in self._fragmentler:
+                self._fragmentler.move_to_end(anahtar)
+                self.isabet += 1
+                return self._fragmentler[anahtar]
+
+        html = uret()
+
+        with self._kilit:
+            self.iskalama += 1
+            self._fragmentler[anahtar] = html
+            self._fragmentler.move_to_end(anahtar)
+            while len(self._fragmentler) > self.max_boyut:
+                self._fragmentler.popitem(last=False)  # En eski sürümleri at
+        return html
+
+    def stats(self):
+        """Fragment cache istatistikleri"""
+        return {
+            "fragment_sayisi": len(self._fragmentler),
+            "isabet": self.isabet,
+            "iskalama": self.iskalama,
+        }
+
+# Global fragment cache instance
+fragment_cache = FragmentCache()
@@ -0,0 +1,104 @@
+# Kütüphane Yönetim Sistemi - Sağlık Kontrolleri
+# Veritabanı ve Redis kontrolleri arka planda belirli aralıklarla çalışır, sonuçlar bellekte tutulur
+# Liveness/readiness probe'ları sadece son sonucu okur - Bağlantı açmaz, beklemez
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Callable, Dict
+import asyncio
+import logging
+import time
+
+from database import engine
+from cache import get_redis
+
+KONTROL_ARALIGI = 10  # saniye - Bağımlılık kontrolleri arası süre
+ZAMAN_ASIMI = 2  # saniye - Tek bir kontrol en fazla bu kadar beklenir
+
+def _veritabani_kontrol():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+def _redis_kontrol():
+    get_redis().ping()
+
+class SaglikIzleyici:
+    """Bağımlılık kontrollerini arka planda çalıştırıp son sonuçları saklar"""
+
+    # Bileşen adı -> (kontrol fonksiyonu, hazır olmak için zorunlu mu?)
+    # Redis zorunlu değil - Cache hataları yakalanır, uygulama veritabanından çalışmaya devam eder
+    BILESENLER: Dict[str, tuple] = {
+        "database": (_veritabani_kontrol, True),
+        "cache": (_redis_kontrol, False),
+    }
+
+    def __init__(self, aralik: int = KONTROL_ARALIGI, zaman_asimi: float = ZAMAN_ASIMI):
+        self.aralik = aralik
+        self.zaman_asimi = zaman_asimi
+        self.sonuclar: Dict[str, Dict] = {}
+        self._bekleyen: Dict[str, asyncio.Future] = {}
+
+    async def _bilesen_kontrol(self, ad: str, kontrol: Callable[[], None]):
+        """Tek bileşeni thread pool'da kontrol et - Asılı kalan bir önceki kontrol varsa yenisini başlatma"""
+        onceki = self._bekleyen.get(ad)
+        if onceki is not None and not onceki.done():
+            self._kaydet(ad, {"durum": "down", "hata": "Önceki kontrol hâlâ yanıt bekliyor", "gecikme_ms": None})
+            return
+
+        baslangic = time.perf_counter()
+        gorev = self._bekleyen[ad] = asyncio.ensure_future(run_in_threadpool(kontrol))
+        try:
+            await asyncio.wait_for(asyncio.shield(gorev), timeout=self.zaman_asimi)
+            sonuc = {"durum": "up", "hata": None}
+        except asyncio.TimeoutError:
+            sonuc = {"durum": "down", "hata": f"{self.zaman_asimi} sn içinde yanıt yok"}
+        except Exception as e:
+            sonuc = {"durum": "down", "hata": str(e)}
+        sonuc["gecikme_ms"] = round((time.perf_counter() - baslangic) * 1000, 2)
+        self._kaydet(ad, sonuc)
+
+    def _kaydet(self, ad: str, sonuc: Dict):
+        """Sonucu sakla - Yavaş bir bileşen diğerlerinin sonucunu geciktirmez"""
+        if sonuc["durum"] != self.sonuclar.get(ad, {}).get("durum"):
+            logging.log(logging.INFO if sonuc["durum"] == "up" else logging.WARNING,
+                        f"Sağlık durumu değişti: {ad} -> {sonuc['durum']} {sonuc['hata'] or ''}")
+        self.sonuclar[ad] = {**sonuc, "kontrol_zamani": datetime.utcnow().isoformat()}
+
+    async def kontrol_et(self):
+        """Tüm bileşenleri paralel kontrol et"""
+        await asyncio.gather(*[self._bilesen_kontrol(ad, kontrol) for ad, (kontrol, _) in self.BILESENLER.items()])
+
+    async def dongu(self):
+        """Periyodik kontrol döngüsü - Uygulama yaşam döngüsü boyunca çalışır"""
+        while True:
+            try:
+                await self.kontrol_et()
+            except Exception as e:
+                logging.error(f"Sağlık kontrolü hatası: {e}")
+            await asyncio.sleep(self.aralik)
+
+    @property
+    def hazir(self) -> bool:
+        """Zorunlu bileşenlerin hepsi son kontrolde ayakta mı"""
+        return all(
+            self.sonuclar.get(ad, {}).get("durum") == "up"
+            for ad, (_, zorunlu) in self.BILESENLER.items() if zorunlu
+        )
+
+    def durum(self) -> str:
+        """healthy: hepsi ayakta, degraded: sadece opsiyoneller düşük, unhealthy: zorunlu bileşen düşük"""
+        if not self.sonuclar:
+            return "starting"  # İlk kontrol henüz bitmedi
+        if not self.hazir:
+            return "unhealthy"
+        if any(self.sonuclar.get(ad, {}).get("durum") != "up" for ad in self.BILESENLER):
+            return "degraded"
+        return "healthy"
+
+    def rapor(self) -> Dict:
+        """Son kontrol sonuçları - Bellekten okunur"""
+        return {"status": self.durum(), "bilesenler": self.sonuclar}
+
+# Global sağlık izleyici instance
+saglik_izleyici = SaglikIzleyici()
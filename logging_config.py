@@ -9,13 +9,13 @@ from datetime import datetime
 from pathlib import Path
 import json
 
-# Log dosyaları için klasör oluştur
+# Log dosyaları için klasör - configure_logging() ile oluşturulur
 log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
 
 # Log formatter - Yapılandırılmış log formatı
 def configure_logging():
     """Logging sistemini yapılandır"""
+    log_dir.mkdir(exist_ok=True)
     
     # Structlog konfigürasyonu
     structlog.configure(
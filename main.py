@@ -2,73 +2,137 @@
 # FastAPI ile modern web API'si ve HTML arayüzü
 # Kitap, üye ve kiralama yönetimi için REST API endpoints
 
-from fastapi import FastAPI, Depends, HTTPException, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from database import get_db, create_tables
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from markupsafe import Markup
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+from database import get_db, create_tables, SessionLocal
 from models import Kitap, Uye, Kiralama
 from schemas import KitapCreate, KitapUpdate, Kitap as KitapSchema
-from schemas import UyeCreate, UyeUpdate, Uye as UyeSchema
-from schemas import KiralamaCreate, Kiralama as KiralamaSchema, KiralamaDetay
-from datetime import datetime, timedelta
-from typing import List, Optional
+from schemas import UyeCreate, UyeUpdate, Uye as UyeSchema, UyeIceAktarmaRaporu
+from schemas import KiralamaCreate, Kiralama as KiralamaSchema, KiralamaDetay, KiralamaGecmisi
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import os
 
 # Teknik iyileştirmeler - Caching, Rate Limiting, Logging
-from cache import cache_manager, cache_result, invalidate_kitap_cache, invalidate_uye_cache, invalidate_kiralama_cache
-from rate_limiter import limiter, rate_limit_middleware
-from logging_config import configure_logging, app_logger, api_logger, db_logger
+from cache import CACHE_KEYS, cache_manager, cache_result, get_cache_stats, invalidate_kitap_cache, invalidate_uye_cache, invalidate_kiralama_cache
+from rate_limiter import RATE_LIMITS, limiter, rate_limit_middleware, get_rate_limit_stats
+from responses import ORJSONResponse, compression_middleware, liste_json, onbellekli_json_yaniti, satirlardan_json
+from static_assets import StaticAssets, FingerprintedStaticFiles
+from fragments import fragment_cache
+from events import event_broker
+from availability import musaitlik_indeksi
+from health import saglik_izleyici
+from logging_config import configure_logging, get_log_stats, app_logger, api_logger, db_logger
+import counters
+import archive
+import analytics
+import member_import
 
-# Logging sistemini başlat
-configure_logging()
+# Statik dosya parmak izleri - Dosyalar uygulama açılışında taranır
+static_assets = StaticAssets("static")
+
+# Veritabanı hazırlığı - Tablolar/kolonlar oluşturulur, sayaçlar gerekirse doldurulur
+def veritabanini_hazirla():
+    create_tables()
+    # Eski veritabanlarında sayaçları ilk kez doldurur - Dolu sayaçlar her açılışta taranmaz
+    # Sonraki kontroller: POST /api/system/counters/reconcile veya SAYAC_UZLASTIRMA_ACILISTA=1
+    with SessionLocal() as db:
+        if counters.ACILISTA_UZLASTIR or counters.sayaclar_bos_mu(db):
+            counters.sayaclari_uzlastir(db)
+        analytics.kovalari_uzlastir(db)
+        musaitlik_indeksi.yukle(db)
+
+# Uygulama yaşam döngüsü - Başlangıç işleri import anında değil worker açılışında yapılır
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    static_assets.tara()
+    await run_in_threadpool(veritabanini_hazirla)
+    
+    # Kiralama arşivi - Teslim edilmiş eski kiralamalar günde bir arka planda arşive taşınır
+    arsiv_gorevi = asyncio.create_task(archive.arsiv_dongusu(SessionLocal))
+    # Sağlık kontrolleri - Probe'lar sadece bu görevin son sonuçlarını okur
+    saglik_gorevi = asyncio.create_task(saglik_izleyici.dongu())
+    app_logger.info("Kütüphane Yönetim Sistemi başlatıldı")
+    
+    yield
+    
+    for gorev in (arsiv_gorevi, saglik_gorevi):
+        gorev.cancel()
+        with suppress(asyncio.CancelledError):
+            await gorev
+    app_logger.info("Kütüphane Yönetim Sistemi durduruldu")
 
 # FastAPI uygulaması oluştur - Ana web uygulaması
-app = FastAPI(title="Kütüphane Yönetim Sistemi", version="1.0.0")
+app = FastAPI(title="Kütüphane Yönetim Sistemi", version="1.0.0", lifespan=lifespan)
 
 # Middleware ekle - Rate limiting ve logging
 app.middleware("http")(rate_limit_middleware)
+# Sıkıştırma - gzip/brotli, eşik üstündeki yanıtlar için
+app.middleware("http")(compression_middleware)
 
 # Statik dosyalar (CSS, JS, resimler) için mount - /static/ URL'inde erişilebilir
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# İçerik hash'li URL'ler (/static/js/app.<hash>.js) immutable olarak cache'lenir
+app.mount("/static", FingerprintedStaticFiles(directory="static", assets=static_assets), name="static")
 # HTML şablonları için Jinja2 motoru - templates/ klasöründeki HTML dosyaları
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = static_assets.url  # {{ static_url('js/app.js') }}
+templates.env.filters["tarih"] = lambda tarih: tarih.strftime("%d.%m.%Y") if tarih else "-"
 
-# Veritabanı tablolarını oluştur - İlk çalıştırmada tablolar oluşturulur
-create_tables()
-
-# Uygulama başlatma logu
-app_logger.info("Kütüphane Yönetim Sistemi başlatıldı")
+# Liste sayfalama - HTML ilk sayfası ve API sayfaları aynı boyutu kullanır
+SAYFA_BOYUTU = 20
+# Tam liste okumaları - Veritabanından parti parti (yield_per) çekilen satır sayısı
+OKUMA_PARTISI = 1000
 
 # Ana sayfa - Dashboard ve istatistikler
 @app.get("/", response_class=HTMLResponse)
 async def ana_sayfa(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 # Kitap API'leri - CRUD işlemleri
-@app.get("/api/kitaplar", response_model=List[KitapSchema])
-@limiter.limit("100/hour")
-async def kitaplari_getir(request: Request, db: Session = Depends(get_db)):
-    # Cache'den veri al
-    cached_data = await cache_manager.get("kitaplar:all")
-    if cached_data:
-        api_logger.info("Kitaplar cache'den alındı")
-        return cached_data
-    
-    # Veritabanından veri al
-    kitaplar = db.query(Kitap).all()
-    db_logger.database_operation("SELECT", "kitaplar", count=len(kitaplar))
+# Liste, arama, dashboard ve kiralama seçicisi aynı endpoint'i kullanır - Genel API limiti uygulanır
+@app.get("/api/kitaplar", response_model=List[KitapSchema], response_class=ORJSONResponse)
+@limiter.limit(RATE_LIMITS["api_general"])
+async def kitaplari_getir(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    q: Optional[str] = None,
+    siralama: str = Query("id", pattern="^-?id$"),  # -id: En yeni kitap önce (dashboard son eklenenler)
+    db: Session = Depends(get_db)
+):
+    # Sayfalı/aramalı istek - Sayfanın ilk yüklemesinden sonra JavaScript kullanır
+    if skip or limit or q or siralama != "id":
+        sorgu = _kitap_sorgusu(q, yeni_once=siralama == "-id")
+        kitaplar = db.execute(sorgu.offset(skip).limit(limit or SAYFA_BOYUTU))
+        return Response(satirlardan_json(KitapSchema, kitaplar), media_type="application/json")
     
-    # Cache'e kaydet
-    await cache_manager.set("kitaplar:all", kitaplar, 300)
-    api_logger.info("Kitaplar veritabanından alındı ve cache'e kaydedildi")
+    def uret():
+        # Veritabanından veri al - Sadece cache boşken çalışır, ORM nesnesi oluşturulmaz
+        kitaplar = db.execute(_kitap_sorgusu().execution_options(yield_per=OKUMA_PARTISI))
+        govde = satirlardan_json(KitapSchema, kitaplar)
+        db_logger.database_operation("SELECT", "kitaplar", bytes=len(govde))
+        api_logger.info("Kitaplar veritabanından alındı ve cache'e kaydedildi")
+        return govde
     
-    return kitaplar
+    # Cache'den al - JSON ve sıkıştırılmış hali birlikte saklanır
+    return await onbellekli_json_yaniti(request, CACHE_KEYS['kitaplar'], uret)
+
+# Müsait kitaplar - Bellek içi indeksten; başka bir worker kitap yazdıysa önce yeniden yüklenir
+@app.get("/api/kitaplar/musait", response_model=List[int], response_class=ORJSONResponse)
+async def musait_kitaplar(db: Session = Depends(get_db)):
+    return musaitlik_indeksi.hazirla(db).musait_idler()
 
 @app.get("/api/kitaplar/{kitap_id}", response_model=KitapSchema)
 async def kitap_getir(kitap_id: int, db: Session = Depends(get_db)):
-    kitap = db.query(Kitap).filter(Kitap.id == kitap_id).first()  # ID'ye göre kitap bul
+    kitap = db.get(Kitap, kitap_id)  # ID'ye göre kitap bul
     if not kitap:
         raise HTTPException(status_code=404, detail="Kitap bulunamadı")  # Kitap yoksa 404 hatası
     return kitap
@@ -78,165 +142,469 @@ async def kitap_getir(kitap_id: int, db: Session = Depends(get_db)):
 async def kitap_ekle(request: Request, kitap: KitapCreate, db: Session = Depends(get_db)):
     db_kitap = Kitap(**kitap.dict())  # Yeni kitap nesnesi oluştur
     db.add(db_kitap)  # Veritabanına ekle
-    db.commit()  # Değişiklikleri kaydet
-    db.refresh(db_kitap)  # ID'yi al
+    counters.kitap_eklendi(db, db_kitap)  # Dashboard sayaçlarını güncelle
+    surum = counters.surum_artir(db, "kitaplar")["kitaplar"]
+    db.commit()  # Değişiklikleri kaydet - ID ve varsayılanlar INSERT ... RETURNING ile geldi
+    # Müsaitlik indeksi commit'ten hemen sonra - Arada await olursa aynı worker'daki yazmalar sırası karışır
+    musaitlik_indeksi.ayarla(db_kitap.id, db_kitap.kiralanabilir, surum)
     
     # Cache'i temizle
     await invalidate_kitap_cache()
     db_logger.database_operation("INSERT", "kitaplar", kitap_id=db_kitap.id)
     api_logger.info("Yeni kitap eklendi", kitap_id=db_kitap.id, baslik=db_kitap.baslik)
+    _olay_yayinla(
+        db, "kitap_eklendi",
+        kitap_id=db_kitap.id, baslik=db_kitap.baslik, yazar=db_kitap.yazar, kiralanabilir=db_kitap.kiralanabilir
+    )
     
     return db_kitap
 
 @app.put("/api/kitaplar/{kitap_id}", response_model=KitapSchema)
 async def kitap_guncelle(kitap_id: int, kitap: KitapUpdate, db: Session = Depends(get_db)):
-    db_kitap = db.query(Kitap).filter(Kitap.id == kitap_id).first()  # Güncellenecek kitabı bul
+    db_kitap = db.get(Kitap, kitap_id)  # Güncellenecek kitabı bul
     if not db_kitap:
         raise HTTPException(status_code=404, detail="Kitap bulunamadı")
     
     # Sadece gönderilen alanları güncelle (exclude_unset=True)
-    for field, value in kitap.dict(exclude_unset=True).items():
+    guncellemeler = kitap.dict(exclude_unset=True)
+    if "kiralanabilir" in guncellemeler and bool(guncellemeler["kiralanabilir"]) != bool(db_kitap.kiralanabilir):
+        counters.kitap_durumu_degisti(db, bool(guncellemeler["kiralanabilir"]))
+    for field, value in guncellemeler.items():
         setattr(db_kitap, field, value)  # Alan değerini güncelle
+    surum = counters.surum_artir(db, "kitaplar")["kitaplar"]
     
-    db.commit()  # Değişiklikleri kaydet
-    db.refresh(db_kitap)  # Güncellenmiş veriyi al
+    db.commit()  # Değişiklikleri kaydet - expire_on_commit=False, yeniden SELECT yok
+    musaitlik_indeksi.ayarla(db_kitap.id, db_kitap.kiralanabilir, surum)
+    
+    # Kiralama detayları kitap bilgisini içerir - İkisini de temizle
+    await invalidate_kitap_cache()
+    await invalidate_kiralama_cache()
+    _olay_yayinla(db, "kitap_guncellendi", kitap_id=db_kitap.id, kiralanabilir=db_kitap.kiralanabilir)
     return db_kitap
 
 @app.delete("/api/kitaplar/{kitap_id}")
 async def kitap_sil(kitap_id: int, db: Session = Depends(get_db)):
-    db_kitap = db.query(Kitap).filter(Kitap.id == kitap_id).first()  # Silinecek kitabı bul
+    db_kitap = db.get(Kitap, kitap_id)  # Silinecek kitabı bul
     if not db_kitap:
         raise HTTPException(status_code=404, detail="Kitap bulunamadı")
     
+    counters.kitap_silindi(db, db_kitap)
+    surum = counters.surum_artir(db, "kitaplar")["kitaplar"]
     db.delete(db_kitap)  # Kitabı sil
     db.commit()  # Değişiklikleri kaydet
+    musaitlik_indeksi.sil(kitap_id, surum)
+    
+    await invalidate_kitap_cache()
+    await invalidate_kiralama_cache()
+    _olay_yayinla(db, "kitap_silindi", kitap_id=kitap_id)
     return {"message": "Kitap silindi"}
 
 # Üye API'leri
-@app.get("/api/uyeler", response_model=List[UyeSchema])
-async def uyeleri_getir(db: Session = Depends(get_db)):
-    return db.query(Uye).all()
+@app.get("/api/uyeler", response_model=List[UyeSchema], response_class=ORJSONResponse)
+async def uyeleri_getir(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    q: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    if skip or limit or q:
+        uyeler = db.execute(_uye_sorgusu(q).offset(skip).limit(limit or SAYFA_BOYUTU))
+        return Response(satirlardan_json(UyeSchema, uyeler), media_type="application/json")
+    
+    return await onbellekli_json_yaniti(
+        request, CACHE_KEYS['uyeler'],
+        lambda: satirlardan_json(UyeSchema, db.execute(_uye_sorgusu().execution_options(yield_per=OKUMA_PARTISI)))
+    )
 
 @app.get("/api/uyeler/{uye_id}", response_model=UyeSchema)
 async def uye_getir(uye_id: int, db: Session = Depends(get_db)):
-    uye = db.query(Uye).filter(Uye.id == uye_id).first()
+    uye = db.get(Uye, uye_id)
     if not uye:
         raise HTTPException(status_code=404, detail="Üye bulunamadı")
     return uye
 
 @app.post("/api/uyeler", response_model=UyeSchema)
 async def uye_ekle(uye: UyeCreate, db: Session = Depends(get_db)):
+    if _email_kayitli(db, uye.email):
+        raise HTTPException(status_code=400, detail="Bu e-posta adresi zaten kayıtlı")
+    
     db_uye = Uye(**uye.dict())
     db.add(db_uye)
+    counters.uye_eklendi(db, db_uye)
+    counters.surum_artir(db, "uyeler")
     db.commit()
-    db.refresh(db_uye)
+    
+    await invalidate_uye_cache()
+    _olay_yayinla(db, "uye_eklendi", uye_id=db_uye.id)
     return db_uye
 
+def _email_kayitli(db: Session, email: str, haric_id: Optional[int] = None) -> bool:
+    """E-posta başka bir üyede kayıtlı mı - lower(email) indeksi ile büyük/küçük harf duyarsız"""
+    sorgu = db.query(Uye.id).filter(func.lower(Uye.email) == email.strip().lower())
+    if haric_id is not None:
+        sorgu = sorgu.filter(Uye.id != haric_id)
+    return sorgu.first() is not None
+
+# Toplu üye içe aktarma - CSV/JSONL dosyası akış halinde işlenir
+@app.post("/api/uyeler/ice-aktar", response_model=UyeIceAktarmaRaporu)
+async def uyeleri_ice_aktar(
+    dosya: UploadFile = File(...),
+    bicim: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+    pasiflestir: bool = False,
+    parti_boyutu: int = Query(member_import.PARTI_BOYUTU, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    try:
+        rapor = await run_in_threadpool(
+            member_import.dosyadan_ice_aktar,
+            dosya.file, bicim or member_import.bicim_tahmin_et(dosya.filename),
+            parti_boyutu=parti_boyutu, pasiflestir=pasiflestir
+        )
+    finally:
+        # Hata olsa bile önceki partiler commit edilmiş olabilir
+        await invalidate_uye_cache()
+        await invalidate_kiralama_cache()
+    api_logger.info("Toplu üye içe aktarma", eklenen=rapor["eklenen"], guncellenen=rapor["guncellenen"])
+    if rapor["eklenen"]:
+        _olay_yayinla(db, "uye_eklendi", adet=rapor["eklenen"])
+    return rapor
+
 @app.put("/api/uyeler/{uye_id}", response_model=UyeSchema)
 async def uye_guncelle(uye_id: int, uye: UyeUpdate, db: Session = Depends(get_db)):
-    db_uye = db.query(Uye).filter(Uye.id == uye_id).first()
+    db_uye = db.get(Uye, uye_id)
     if not db_uye:
         raise HTTPException(status_code=404, detail="Üye bulunamadı")
     
-    for field, value in uye.dict(exclude_unset=True).items():
+    guncellemeler = uye.dict(exclude_unset=True)
+    email_degisti = "email" in guncellemeler and guncellemeler["email"].strip().lower() != db_uye.email.lower()
+    if email_degisti and _email_kayitli(db, guncellemeler["email"], haric_id=uye_id):
+        raise HTTPException(status_code=400, detail="Bu e-posta adresi zaten kayıtlı")
+    
+    for field, value in guncellemeler.items():
         setattr(db_uye, field, value)
+    counters.surum_artir(db, "uyeler")
     
     db.commit()
-    db.refresh(db_uye)
+    
+    await invalidate_uye_cache()
+    await invalidate_kiralama_cache()
     return db_uye
 
 @app.delete("/api/uyeler/{uye_id}")
 async def uye_sil(uye_id: int, db: Session = Depends(get_db)):
-    db_uye = db.query(Uye).filter(Uye.id == uye_id).first()
+    db_uye = db.get(Uye, uye_id)
     if not db_uye:
         raise HTTPException(status_code=404, detail="Üye bulunamadı")
     
+    counters.uye_silindi(db, db_uye)
+    counters.surum_artir(db, "uyeler")
     db.delete(db_uye)
     db.commit()
+    
+    await invalidate_uye_cache()
+    await invalidate_kiralama_cache()
+    _olay_yayinla(db, "uye_silindi", uye_id=uye_id)
     return {"message": "Üye silindi"}
 
 # Kiralama API'leri
-@app.get("/api/kiralamalar", response_model=List[KiralamaDetay])
-async def kiralamalari_getir(db: Session = Depends(get_db)):
-    return db.query(Kiralama).all()
+@app.get("/api/kiralamalar", response_model=List[KiralamaDetay], response_class=ORJSONResponse)
+async def kiralamalari_getir(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    q: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    if skip or limit or q:
+        kiralamalar = _kiralama_sorgusu(db, q).offset(skip).limit(limit or SAYFA_BOYUTU).all()
+        return Response(liste_json(KiralamaDetay, kiralamalar), media_type="application/json")
+    
+    # Kitap ve üye joinedload ile aynı sorguda - Satır başına lazy load (N+1) yok
+    return await onbellekli_json_yaniti(
+        request, CACHE_KEYS['kiralamalar'], lambda: liste_json(KiralamaDetay, _kiralama_sorgusu(db).all())
+    )
+
+# Kiralama geçmişi - Aktif tablo ve arşiv birlikte, en yeni önce
+@app.get("/api/kiralamalar/gecmis", response_model=List[KiralamaGecmisi], response_class=ORJSONResponse)
+async def kiralama_gecmisi(
+    uye_id: Optional[int] = None,
+    kitap_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(SAYFA_BOYUTU, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    gecmis = archive.kiralama_gecmisi(db, uye_id=uye_id, kitap_id=kitap_id, skip=skip, limit=limit)
+    return Response(liste_json(KiralamaGecmisi, gecmis), media_type="application/json")
 
 @app.post("/api/kiralamalar", response_model=KiralamaSchema)
 async def kitap_kirala(kiralama: KiralamaCreate, db: Session = Depends(get_db)):
-    # Kitap ve üye kontrolü - Geçerli ID'ler mi?
-    kitap = db.query(Kitap).filter(Kitap.id == kiralama.kitap_id).first()
-    if not kitap:
-        raise HTTPException(status_code=404, detail="Kitap bulunamadı")
+    # Ön kontrol - Olmayan veya kiralanmış kitaplar bellek içi indeksten reddedilir
+    # Ret sadece indeks güncelse (başka worker kitap yazmadıysa); değilse aşağıdaki koşullu UPDATE karar verir
+    # Müsait cevabı zaten UPDATE'e gider - Başarılı kiralamada sürüm okunmaz
+    musait = musaitlik_indeksi.musait_mi(kiralama.kitap_id)
+    if not musait and musaitlik_indeksi.guncel_mi(db):
+        if musait is None:
+            raise HTTPException(status_code=404, detail="Kitap bulunamadı")
+        raise HTTPException(status_code=400, detail="Kitap şu anda kiralanabilir değil")
     
-    uye = db.query(Uye).filter(Uye.id == kiralama.uye_id).first()
+    # Üye kontrolü - Geçerli ID mi?
+    uye = db.get(Uye, kiralama.uye_id)
     if not uye:
         raise HTTPException(status_code=404, detail="Üye bulunamadı")
     
-    # Kitap kiralanabilir mi kontrolü - Kitap müsait mi?
-    if not kitap.kiralanabilir:
-        raise HTTPException(status_code=400, detail="Kitap şu anda kiralanabilir değil")
-    
-    # Aktif kiralama var mı kontrolü - Kitap zaten kiralanmış mı?
-    aktif_kiralama = db.query(Kiralama).filter(
-        Kiralama.kitap_id == kiralama.kitap_id,
-        Kiralama.durum == "aktif"
+    # Kitabı kiralanamaz yap - Koşullu UPDATE ... RETURNING, kitap hâlâ müsaitse tek ifadede kilitlenir
+    # kiralanabilir elle (PUT) True yapılmış olabilir - Aktif kiralama NOT EXISTS ile aynı ifadede aranır
+    aktif_kiralama_var = (
+        select(Kiralama.id)
+        .where(Kiralama.kitap_id == Kitap.id, Kiralama.durum == "aktif")
+        .exists()
+    )
+    kitap = db.execute(
+        update(Kitap)
+        .where(Kitap.id == kiralama.kitap_id, Kitap.kiralanabilir == True, ~aktif_kiralama_var)
+        .values(kiralanabilir=False, kiralama_sayisi=Kitap.kiralama_sayisi + 1)
+        .returning(Kitap.id, Kitap.yazar)
     ).first()
-    
-    if aktif_kiralama:
-        raise HTTPException(status_code=400, detail="Kitap zaten kiralanmış")
+    if kitap is None:
+        db_kitap = db.get(Kitap, kiralama.kitap_id)
+        if db_kitap is None:
+            raise HTTPException(status_code=404, detail="Kitap bulunamadı")
+        if db_kitap.kiralanabilir:
+            raise HTTPException(status_code=400, detail="Kitap zaten kiralanmış")
+        raise HTTPException(status_code=400, detail="Kitap şu anda kiralanabilir değil")
     
     # Kiralama oluştur - Yeni kiralama kaydı
     db_kiralama = Kiralama(**kiralama.dict())
     db.add(db_kiralama)
     
-    # Kitabı kiralanamaz yap - Kitap artık kiralanamaz durumda
-    kitap.kiralanabilir = False
-    db.commit()  # Tüm değişiklikleri kaydet
-    db.refresh(db_kiralama)  # Yeni kiralama ID'sini al
+    counters.kitap_kiralandi(db, uye)
+    analytics.kitap_kiralandi(db, kitap.id, kitap.yazar, uye.id)
+    surum = counters.surum_artir(db, "kiralamalar", "kitaplar")["kitaplar"]
+    db.commit()  # Tüm değişiklikleri kaydet - Kiralama ID'si INSERT ... RETURNING ile geldi
+    musaitlik_indeksi.ayarla(db_kiralama.kitap_id, False, surum)
+    
+    # Kitap durumu ve üye sayaçları da değişti
+    await invalidate_kiralama_cache()
+    await invalidate_kitap_cache()
+    await invalidate_uye_cache()
+    _olay_yayinla(
+        db, "kitap_kiralandi",
+        kiralama_id=db_kiralama.id, kitap_id=db_kiralama.kitap_id, uye_id=db_kiralama.uye_id,
+        kiralama_tarihi=db_kiralama.kiralama_tarihi
+    )
     
     return db_kiralama
 
 @app.put("/api/kiralamalar/{kiralama_id}/teslim")
 async def kitap_teslim_et(kiralama_id: int, db: Session = Depends(get_db)):
-    kiralama = db.query(Kiralama).filter(Kiralama.id == kiralama_id).first()  # Kiralama kaydını bul
-    if not kiralama:
-        raise HTTPException(status_code=404, detail="Kiralama bulunamadı")
-    
-    if kiralama.durum != "aktif":  # Kiralama aktif mi?
+    # Teslim işlemi - Sadece aktif kiralama güncellenir, kitap/üye ID'leri RETURNING ile döner
+    teslim_tarihi = datetime.utcnow()
+    kiralama = db.execute(
+        update(Kiralama)
+        .where(Kiralama.id == kiralama_id, Kiralama.durum == "aktif")
+        .values(teslim_tarihi=teslim_tarihi, durum="teslim_edildi")
+        .returning(Kiralama.id, Kiralama.kitap_id, Kiralama.uye_id)
+    ).first()
+    if kiralama is None:
+        if db.get(Kiralama, kiralama_id) is None:
+            raise HTTPException(status_code=404, detail="Kiralama bulunamadı")
         raise HTTPException(status_code=400, detail="Kiralama zaten teslim edilmiş")
     
-    # Teslim işlemi - Teslim tarihini ve durumunu güncelle
-    kiralama.teslim_tarihi = datetime.utcnow()  # Şu anki zamanı teslim tarihi yap
-    kiralama.durum = "teslim_edildi"  # Durumu teslim edildi yap
-    
-    # Kitabı tekrar kiralanabilir yap - Kitap artık tekrar kiralanabilir
-    kitap = db.query(Kitap).filter(Kitap.id == kiralama.kitap_id).first()
-    kitap.kiralanabilir = True  # Kitabı müsait yap
+    # Kitabı tekrar kiralanabilir yap - Kitap silinmişse UPDATE satır döndürmez
+    kitap = db.execute(
+        update(Kitap)
+        .where(Kitap.id == kiralama.kitap_id)
+        .values(kiralanabilir=True)
+        .returning(Kitap.id, Kitap.yazar)
+        .execution_options(synchronize_session=False)
+    ).first()
+    counters.kitap_teslim_edildi(db, kiralama.uye_id, teslim_tarihi, kitap_var=kitap is not None)
+    analytics.kitap_teslim_edildi(db, kiralama.kitap_id, kitap.yazar if kitap else None, kiralama.uye_id, teslim_tarihi)
+    surum = counters.surum_artir(db, "kiralamalar", "kitaplar")["kitaplar"]
     
     db.commit()  # Tüm değişiklikleri kaydet
+    if kitap:
+        musaitlik_indeksi.ayarla(kiralama.kitap_id, True, surum)
+    else:
+        musaitlik_indeksi.sil(kiralama.kitap_id, surum)
+    
+    await invalidate_kiralama_cache()
+    await invalidate_kitap_cache()
+    await invalidate_uye_cache()
+    _olay_yayinla(
+        db, "kitap_teslim_edildi",
+        kiralama_id=kiralama.id, kitap_id=kiralama.kitap_id, uye_id=kiralama.uye_id
+    )
     return {"message": "Kitap teslim edildi"}
 
-# Özel sayfalar
+# Liste sorguları - HTML ilk sayfası ve sayfalı API aynı sıralama/aramayı kullanır
+# Kitap ve üye listeleri salt okunur Core sorgularıdır - Sadece şemadaki kolonlar seçilir
+def _sema_kolonlari(model, schema):
+    """Pydantic şemasındaki alanlara karşılık gelen tablo kolonları"""
+    return [model.__table__.c[alan] for alan in schema.model_fields if alan in model.__table__.c]
+
+def _kitap_sorgusu(arama: Optional[str] = None, yeni_once: bool = False):
+    sorgu = select(*_sema_kolonlari(Kitap, KitapSchema))
+    if arama:
+        desen = f"%{arama}%"
+        sorgu = sorgu.where(or_(
+            Kitap.baslik.ilike(desen), Kitap.yazar.ilike(desen),
+            Kitap.yayin_evi.ilike(desen), Kitap.isbn.ilike(desen)
+        ))
+    return sorgu.order_by(Kitap.id.desc() if yeni_once else Kitap.id)
+
+def _uye_sorgusu(arama: Optional[str] = None):
+    sorgu = select(*_sema_kolonlari(Uye, UyeSchema))
+    if arama:
+        desen = f"%{arama}%"
+        sorgu = sorgu.where(or_(
+            Uye.ad.ilike(desen), Uye.soyad.ilike(desen),
+            Uye.email.ilike(desen), Uye.telefon.ilike(desen)
+        ))
+    return sorgu.order_by(Uye.id)
+
+def _kiralama_sorgusu(db: Session, arama: Optional[str] = None):
+    sorgu = db.query(Kiralama).options(joinedload(Kiralama.kitap), joinedload(Kiralama.uye))
+    if arama:
+        desen = f"%{arama}%"
+        sorgu = sorgu.join(Kiralama.kitap).join(Kiralama.uye).filter(or_(
+            Kitap.baslik.ilike(desen), Uye.ad.ilike(desen), Uye.soyad.ilike(desen)
+        ))
+    return sorgu.order_by(Kiralama.id)
+
+def _ilk_sayfa(db: Session, sablon: str, baglam_adi: str, getir: Callable[[int], list], *tablolar: str):
+    """İlk sayfa satırlarını render et - Tablo sürümlerine göre fragment cache'den döner
+
+    getir(n): İlk n satırı döndürür (Core Row veya ORM nesnesi - Şablon sadece alan adlarını kullanır)
+    """
+    def uret():
+        satirlar = getir(SAYFA_BOYUTU + 1)
+        html = templates.get_template(sablon).render(**{baglam_adi: satirlar[:SAYFA_BOYUTU]})
+        return {
+            "satirlar": Markup(html),
+            "ilk_sayfa_sayisi": min(len(satirlar), SAYFA_BOYUTU),
+            "daha_fazla": len(satirlar) > SAYFA_BOYUTU,
+        }
+    
+    anahtar = (sablon, counters.surum_anahtari(db, *tablolar))
+    return {**fragment_cache.get_or_render(anahtar, uret), "sayfa_boyutu": SAYFA_BOYUTU}
+
+# Özel sayfalar - İlk sayfa sunucuda render edilir, sonraki sayfalar ve arama JavaScript ile
 @app.get("/kitaplar", response_class=HTMLResponse)
-async def kitaplar_sayfasi(request: Request):
-    return templates.TemplateResponse("kitaplar.html", {"request": request})
+async def kitaplar_sayfasi(request: Request, db: Session = Depends(get_db)):
+    sayfa = _ilk_sayfa(
+        db, "partials/kitap_satirlari.html", "kitaplar",
+        lambda n: db.execute(_kitap_sorgusu().limit(n)).all(), "kitaplar"
+    )
+    return templates.TemplateResponse(request, "kitaplar.html", sayfa)
 
 @app.get("/uyeler", response_class=HTMLResponse)
-async def uyeler_sayfasi(request: Request):
-    return templates.TemplateResponse("uyeler.html", {"request": request})
+async def uyeler_sayfasi(request: Request, db: Session = Depends(get_db)):
+    sayfa = _ilk_sayfa(
+        db, "partials/uye_satirlari.html", "uyeler",
+        lambda n: db.execute(_uye_sorgusu().limit(n)).all(), "uyeler"
+    )
+    return templates.TemplateResponse(request, "uyeler.html", sayfa)
 
 @app.get("/kiralamalar", response_class=HTMLResponse)
-async def kiralamalar_sayfasi(request: Request):
-    return templates.TemplateResponse("kiralamalar.html", {"request": request})
+async def kiralamalar_sayfasi(request: Request, db: Session = Depends(get_db)):
+    sayfa = _ilk_sayfa(
+        db, "partials/kiralama_satirlari.html", "kiralamalar",
+        lambda n: _kiralama_sorgusu(db).limit(n).all(),
+        "kiralamalar", "kitaplar", "uyeler"
+    )
+    return templates.TemplateResponse(request, "kiralamalar.html", sayfa)
+
+# Canlı olaylar - Yazma endpoint'leri commit'ten sonra yayınlar
+def _olay_yayinla(db: Session, tip: str, **veri):
+    """Olayı güncel dashboard sayaçlarıyla birlikte yayınla - Dinleyen yoksa hiçbir şey yapmaz"""
+    if not event_broker.abone_var:
+        return
+    event_broker.yayinla(tip, {**veri, "sayaclar": counters.dashboard_sayaclari(db)})
+
+@app.get("/api/events")
+async def olaylar(request: Request):
+    """Server-Sent Events akışı - Dashboard canlı güncellemeleri"""
+    return StreamingResponse(
+        event_broker.akis(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Dashboard istatistikleri - Önceden hesaplanmış sayaçlardan okunur
+@app.get("/api/istatistikler")
+async def istatistikler(db: Session = Depends(get_db)):
+    return counters.dashboard_sayaclari(db)
+
+# Raporlar - Kiralama kovalarından okunur, sonuçlar stats:* altında cache'lenir
+def _rapor_penceresi(gun: int, baslangic: Optional[date], bitis: Optional[date]):
+    try:
+        return analytics.pencere(gun, baslangic, bitis)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/reports/populer")
+async def populer_rapor(
+    boyut: str = Query("kitap", pattern="^(kitap|yazar|uye)$"),
+    gun: int = Query(30, ge=1, le=3660),
+    baslangic: Optional[date] = None,
+    bitis: Optional[date] = None,
+    limit: int = Query(5, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """En çok kiralanan kitaplar, yazarlar veya üyeler - Varsayılan: son 30 gün"""
+    baslangic, bitis = _rapor_penceresi(gun, baslangic, bitis)
+    anahtar = f"{CACHE_KEYS['populer_kitaplar']}:{boyut}:{baslangic}:{bitis}:{limit}"
+    rapor = await cache_manager.get(anahtar)
+    if rapor is None:
+        rapor = {
+            "boyut": boyut, "baslangic": baslangic.isoformat(), "bitis": bitis.isoformat(),
+            "sonuclar": analytics.populer(db, boyut, baslangic, bitis, limit)
+        }
+        await cache_manager.set(anahtar, rapor)
+    return rapor
+
+@app.get("/api/reports/trend")
+async def trend_raporu(
+    periyot: str = Query("gun", pattern="^(gun|ay)$"),
+    gun: int = Query(7, ge=1, le=366),
+    baslangic: Optional[date] = None,
+    bitis: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Gün veya ay başına toplam kiralama/teslim sayıları - Varsayılan: son 7 gün"""
+    baslangic, bitis = _rapor_penceresi(gun, baslangic, bitis)
+    if periyot == "gun" and (bitis - baslangic).days >= 366:
+        raise HTTPException(status_code=400, detail="Günlük trend en fazla 366 gün olabilir")
+    return {
+        "periyot": periyot, "baslangic": baslangic.isoformat(), "bitis": bitis.isoformat(),
+        "noktalar": analytics.trend(db, baslangic, bitis, periyot)
+    }
+
+@app.get("/api/reports/aylik")
+async def aylik_rapor(
+    ay: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    limit: int = Query(5, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Aylık özet - Yeni kitap/üye, kiralama/teslim sayıları ve ayın en popülerleri (varsayılan: bu ay)"""
+    try:
+        ay_baslangici = datetime.strptime(ay, "%Y-%m").date() if ay else datetime.utcnow().date().replace(day=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz ay")
+    anahtar = f"{CACHE_KEYS['aylik_rapor']}:{ay_baslangici:%Y-%m}:{limit}"
+    rapor = await cache_manager.get(anahtar)
+    if rapor is None:
+        rapor = analytics.aylik_rapor(db, ay_baslangici, limit)
+        await cache_manager.set(anahtar, rapor)
+    return rapor
 
 # Sistem durumu ve istatistikler
 @app.get("/api/system/stats")
 async def sistem_istatistikleri():
     """Sistem durumu ve performans istatistikleri"""
     try:
-        from cache import get_cache_stats
-        from rate_limiter import get_rate_limit_stats
-        from logging_config import get_log_stats
-        
         cache_stats = await get_cache_stats()
         rate_limit_stats = get_rate_limit_stats()
         log_stats = get_log_stats()
@@ -245,37 +613,59 @@ async def sistem_istatistikleri():
             "cache": cache_stats,
             "rate_limiting": rate_limit_stats,
             "logging": log_stats,
+            "fragment_cache": fragment_cache.stats(),
+            "events": event_broker.stats(),
+            "musaitlik_indeksi": musaitlik_indeksi.stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
         app_logger.error(f"Sistem istatistikleri hatası: {e}")
         return {"error": "İstatistikler alınamadı"}
 
+@app.post("/api/system/counters/reconcile")
+async def sayaclari_uzlastir(duzelt: bool = True, db: Session = Depends(get_db)):
+    """Sayaçları kaynak tablolarla karşılaştır ve uyuşmazlıkları düzelt - Event loop'u bloklamamak için thread pool'da"""
+    sonuc = await run_in_threadpool(counters.sayaclari_uzlastir, db, duzelt=duzelt)
+    app_logger.info("Sayaç uzlaştırması tamamlandı", fark_sayisi=len(sonuc["farklar"]))
+    return sonuc
+
+@app.post("/api/system/archive", status_code=202)
+async def kiralamalari_arsivle(
+    background_tasks: BackgroundTasks,
+    gun: int = Query(archive.ARSIV_YASI_GUN, ge=0),
+    parti_boyutu: int = Query(archive.ARSIV_PARTI_BOYUTU, ge=1, le=10000)
+):
+    """Teslim edilmiş eski kiralamaları arka planda arşive taşı"""
+    background_tasks.add_task(archive.arsiv_isi, SessionLocal, gun, parti_boyutu)
+    app_logger.info("Kiralama arşivleme başlatıldı", gun=gun, parti_boyutu=parti_boyutu)
+    return {"message": "Arşivleme başlatıldı", "gun": gun, "parti_boyutu": parti_boyutu}
+
+@app.get("/api/system/archive")
+async def arsiv_durumu(db: Session = Depends(get_db)):
+    """Aktif kiralama tablosu ve arşiv boyutları"""
+    return archive.arsiv_istatistikleri(db)
+
+# Sağlık kontrolleri - Arka planda güncellenen sonuçlardan okunur, istek başına bağlantı açılmaz
 @app.get("/api/system/health")
 async def sistem_sagligi():
-    """Sistem sağlık kontrolü"""
-    try:
-        # Veritabanı bağlantısı test et
-        db = next(get_db())
-        db.execute("SELECT 1")
-        
-        # Cache bağlantısı test et
-        await cache_manager.set("health_check", "ok", 10)
-        cache_result = await cache_manager.get("health_check")
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "cache": "connected" if cache_result == "ok" else "disconnected",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        app_logger.error(f"Sistem sağlık kontrolü hatası: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    """Sistem sağlık kontrolü - Son arka plan kontrolünün özeti"""
+    sonuclar = saglik_izleyici.sonuclar
+    return {
+        **saglik_izleyici.rapor(),
+        "database": "connected" if sonuclar.get("database", {}).get("durum") == "up" else "disconnected",
+        "cache": "connected" if sonuclar.get("cache", {}).get("durum") == "up" else "disconnected",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/system/health/live")
+async def canlilik():
+    """Liveness probe - Süreç istek karşılayabiliyor mu"""
+    return {"status": "alive"}
+
+@app.get("/api/system/health/ready")
+async def hazirlik():
+    """Readiness probe - Zorunlu bağımlılıklar son kontrolde ayaktaysa 200, değilse 503"""
+    return JSONResponse(saglik_izleyici.rapor(), status_code=200 if saglik_izleyici.hazir else 503)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,291 @@
+# Kütüphane Yönetim Sistemi - Toplu Üye İçe Aktarma
+# CSV/JSONL dosyalarından akış halinde üye ekleme/güncelleme (okul, üniversite kayıtları)
+# E-posta büyük/küçük harf duyarsız eşleşir, partiler ayrı transaction'larda yazılır, bellek kullanımı sabittir
+
+from sqlalchemy import Column, MetaData, String, Table, bindparam, func, insert, select, update
+from sqlalchemy.engine import Connection
+from pydantic import ValidationError
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+
+from database import engine
+from models import Uye
+from schemas import UyeCreate
+import counters
+
+PARTI_BOYUTU = 1000  # Parti başına satır - SQLite parametre sınırının altında kalır
+RAPOR_LIMITI = 1000  # Raporda detaylı listelenen en fazla hata/tekrar
+UYE_ALANLARI = ("ad", "soyad", "email", "telefon", "adres")
+
+# İçe aktarılan e-postalar - Bağlantıya özel geçici tablo, dosya içi tekrarlar ve pasifleştirme için
+_ice_aktarilanlar = Table(
+    "ice_aktarilan_emailler",
+    MetaData(),
+    Column("email", String(100), primary_key=True),
+    prefixes=["TEMPORARY"]
+)
+# Hatalı satırlardaki e-postalar - Bu üyeler güncellenmez ama pasifleştirilmez de
+_korunanlar = Table(
+    "ice_aktarilmayan_emailler",
+    MetaData(),
+    Column("email", String(100), primary_key=True),
+    prefixes=["TEMPORARY"]
+)
+
+def satirlari_oku(dosya: IO[str], bicim: str) -> Iterator[Optional[Dict[str, Any]]]:
+    """Dosyayı satır satır oku - Okunamayan JSONL satırları için None döner"""
+    if bicim == "csv":
+        yield from csv.DictReader(dosya)
+        return
+
+    for satir in dosya:
+        satir = satir.strip()
+        if not satir:
+            continue
+        try:
+            veri = json.loads(satir)
+        except ValueError:
+            veri = None
+        yield veri if isinstance(veri, dict) else None
+
+def bicim_tahmin_et(dosya_adi: Optional[str]) -> str:
+    """Dosya uzantısından biçimi bul - .jsonl/.ndjson dışındaki her şey CSV sayılır"""
+    if dosya_adi and dosya_adi.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+def uyeleri_ice_aktar(
+    satirlar: Iterable[Optional[Dict[str, Any]]],
+    parti_boyutu: int = PARTI_BOYUTU,
+    pasiflestir: bool = False
+) -> Dict:
+    """Üyeleri partiler halinde ekle/güncelle ve çakışma raporu döndür
+
+    pasiflestir=True: Dosyada olmayan aktif üyeler aktif=False yapılır (tek UPDATE ile).
+    Hatalı satırların e-postaları korunur; e-postası okunamayan hatalı satır varsa pasifleştirme atlanır.
+    Dosya yarıda okunamazsa (UTF-8 olmayan bayt, bozuk CSV) okunan satırlar yazılır, hata raporlanır.
+    """
+    rapor = {
+        "okunan": 0, "eklenen": 0, "guncellenen": 0, "tekrar_eden": 0,
+        "hatali": 0, "pasiflestirilen": 0, "pasiflestirme_atlandi": False, "okuma_hatasi": None, "hatalar": []
+    }
+
+    # Geçici tablo bağlantıya özeldir - Tüm partiler aynı bağlantıda, commit'ler arası korunur
+    with engine.connect() as conn:
+        for tablo in (_ice_aktarilanlar, _korunanlar):
+            tablo.create(conn, checkfirst=True)
+            conn.execute(tablo.delete())
+        conn.commit()
+
+        try:
+            parti: List[Tuple[int, UyeCreate]] = []
+            korunanlar: List[str] = []
+            try:
+                for satir_no, satir in enumerate(satirlar, start=1):
+                    rapor["okunan"] += 1
+                    uye, hata = _dogrula(satir)
+                    if hata:
+                        email = (satir or {}).get("email")
+                        _hata_ekle(rapor, "hatali", satir_no, email, hata)
+                        # Korunan e-postalar sadece pasifleştirmede gerekir - Aksi halde liste hiç büyümez
+                        if not pasiflestir:
+                            continue
+                        if isinstance(email, str) and "@" in email:
+                            korunanlar.append(email.strip().lower())
+                            if len(korunanlar) >= parti_boyutu:
+                                _korunanlari_yaz(conn, korunanlar)
+                                korunanlar = []
+                        else:
+                            rapor["pasiflestirme_atlandi"] = True
+                        continue
+
+                    parti.append((satir_no, uye))
+                    if len(parti) >= parti_boyutu:
+                        _parti_yaz(conn, parti, rapor)
+                        parti = []
+            except (UnicodeDecodeError, csv.Error) as e:
+                # Dosyanın kalanı okunamaz - Eksik dosyaya göre kimse pasifleştirilmez
+                rapor["okuma_hatasi"] = _okuma_hatasi_mesaji(e, rapor["okunan"] + 1)
+                rapor["pasiflestirme_atlandi"] = pasiflestir
+            if parti:
+                _parti_yaz(conn, parti, rapor)
+
+            if pasiflestir and not rapor["pasiflestirme_atlandi"]:
+                _korunanlari_yaz(conn, korunanlar)
+                rapor["pasiflestirilen"] = _eksikleri_pasiflestir(conn)
+        finally:
+            conn.rollback()  # Yarım kalan parti varsa geri al - Önceki partiler zaten commit edildi
+            for tablo in (_ice_aktarilanlar, _korunanlar):
+                tablo.drop(conn, checkfirst=True)
+            conn.commit()
+
+    if rapor["okuma_hatasi"]:
+        logging.warning(f"Üye içe aktarma: {rapor['okuma_hatasi']}")
+    if rapor["pasiflestirme_atlandi"]:
+        logging.warning("Üye içe aktarma: Dosya eksik okundu veya e-postası okunamayan hatalı satırlar var, pasifleştirme atlandı")
+    logging.info(
+        f"Üye içe aktarma: {rapor['okunan']} satır, {rapor['eklenen']} eklendi, "
+        f"{rapor['guncellenen']} güncellendi, {rapor['tekrar_eden'] + rapor['hatali']} çakışma/hata"
+    )
+    return rapor
+
+def _okuma_hatasi_mesaji(hata: Exception, satir_no: int) -> str:
+    """Dosya okuma hatası için kullanıcıya gösterilecek mesaj"""
+    if isinstance(hata, UnicodeDecodeError):
+        neden = "Dosya UTF-8 değil (örn. Excel'in Windows-1254 çıktısı) - UTF-8 olarak kaydedip tekrar yükleyin"
+    else:
+        neden = f"CSV okunamadı: {hata}"
+    return f"{neden}; {satir_no}. satır ve sonrası içe aktarılmadı"
+
+def _dogrula(satir: Optional[Dict[str, Any]]) -> Tuple[Optional[UyeCreate], Optional[str]]:
+    """Satırı UyeCreate şemasıyla doğrula - Boş opsiyonel alanlar None olur"""
+    if satir is None:
+        return None, "Geçersiz JSON satırı"
+
+    temiz = {}
+    for alan in UYE_ALANLARI:
+        deger = satir.get(alan)
+        if isinstance(deger, str):
+            deger = deger.strip() or None
+        temiz[alan] = deger
+
+    try:
+        uye = UyeCreate(**temiz)
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, hata['loc']))}: {hata['msg']}" for hata in e.errors())
+    if "@" not in uye.email:
+        return None, "Geçersiz e-posta adresi"
+    return uye, None
+
+def _hata_ekle(rapor: Dict, tur: str, satir_no: int, email: Optional[str], hata: str):
+    """Sayacı artır, detayı sadece ilk RAPOR_LIMITI kayıt için sakla"""
+    rapor[tur] += 1
+    if len(rapor["hatalar"]) < RAPOR_LIMITI:
+        rapor["hatalar"].append({"satir": satir_no, "email": email, "hata": hata})
+
+def _parti_yaz(conn: Connection, parti: List[Tuple[int, UyeCreate]], rapor: Dict):
+    """Bir partiyi tek transaction'da yaz - Mevcut üyeler güncellenir, yeniler eklenir"""
+    # Dosya içi tekrarlar - Aynı parti ve önceki partiler (geçici tablo) kontrol edilir
+    emailler: Dict[str, Tuple[int, UyeCreate]] = {}
+    for satir_no, uye in parti:
+        anahtar = uye.email.lower()
+        if anahtar in emailler:
+            _hata_ekle(rapor, "tekrar_eden", satir_no, uye.email, f"E-posta dosyada tekrar ediyor (satır {emailler[anahtar][0]})")
+        else:
+            emailler[anahtar] = (satir_no, uye)
+
+    onceki = conn.scalars(select(_ice_aktarilanlar.c.email).where(_ice_aktarilanlar.c.email.in_(list(emailler)))).all()
+    for anahtar in onceki:
+        satir_no, uye = emailler.pop(anahtar)
+        _hata_ekle(rapor, "tekrar_eden", satir_no, uye.email, "E-posta dosyada daha önce geçti")
+    if not emailler:
+        return
+
+    conn.execute(insert(_ice_aktarilanlar), [{"email": anahtar} for anahtar in emailler])
+
+    # Mevcut üyeler - lower(email) indeksi ile tek sorgu
+    mevcut = dict(conn.execute(
+        select(func.lower(Uye.email), Uye.id).where(func.lower(Uye.email).in_(list(emailler)))
+    ).all())
+
+    yeniler = [uye.dict() for anahtar, (_, uye) in emailler.items() if anahtar not in mevcut]
+    guncellenecekler = [
+        {"b_id": mevcut[anahtar], **{f"b_{alan}": deger for alan, deger in uye.dict().items() if alan != "email"}}
+        for anahtar, (_, uye) in emailler.items() if anahtar in mevcut
+    ]
+
+    if yeniler:
+        conn.execute(insert(Uye), yeniler)
+        counters.sayaclari_artir(conn, {
+            counters.TOPLAM_UYE: len(yeniler),
+            counters.ay_anahtari(counters.YENI_UYE): len(yeniler),
+        })
+    if guncellenecekler:
+        # Mevcut e-posta yazımı korunur, içe aktarılan üye tekrar aktif olur
+        # Dosyada olmayan/boş opsiyonel alanlar (telefon, adres) mevcut değeri silmez
+        tablo = Uye.__table__
+        conn.execute(
+            update(tablo)
+            .where(tablo.c.id == bindparam("b_id"))
+            .values(
+                ad=bindparam("b_ad"), soyad=bindparam("b_soyad"),
+                telefon=func.coalesce(bindparam("b_telefon"), tablo.c.telefon),
+                adres=func.coalesce(bindparam("b_adres"), tablo.c.adres),
+                aktif=True
+            ),
+            guncellenecekler
+        )
+    # Her parti kendi sürümüyle commit edilir - Sonraki parti hata verse de liste cache'leri eskimez
+    counters.surum_artir(conn, "uyeler")
+    conn.commit()
+
+    rapor["eklenen"] += len(yeniler)
+    rapor["guncellenen"] += len(guncellenecekler)
+
+def _korunanlari_yaz(conn: Connection, emailler: List[str]):
+    """Hatalı satırların e-postalarını geçici tabloya ekle - Aynı e-posta birden fazla hatalı satırda olabilir"""
+    if emailler:
+        conn.execute(insert(_korunanlar).prefix_with("OR IGNORE"), [{"email": email} for email in emailler])
+        conn.commit()
+
+def _eksikleri_pasiflestir(conn: Connection) -> int:
+    """Dosyada olmayan aktif üyeleri tek set tabanlı UPDATE ile pasifleştir - Hatalı satırlardakiler hariç"""
+    sonuc = conn.execute(
+        update(Uye)
+        .where(
+            Uye.aktif == True,
+            func.lower(Uye.email).not_in(select(_ice_aktarilanlar.c.email)),
+            func.lower(Uye.email).not_in(select(_korunanlar.c.email))
+        )
+        .values(aktif=False)
+    )
+    counters.surum_artir(conn, "uyeler")
+    conn.commit()
+    return sonuc.rowcount
+
+def dosyadan_ice_aktar(dosya: IO[bytes], bicim: str, **kwargs) -> Dict:
+    """Binary dosyayı (upload veya disk) UTF-8 metin olarak akış halinde içe aktar"""
+    metin = io.TextIOWrapper(dosya, encoding="utf-8-sig", newline="")
+    try:
+        return uyeleri_ice_aktar(satirlari_oku(metin, bicim), **kwargs)
+    finally:
+        metin.detach()  # Alttaki dosyayı kapatma - Sahibi çağıran taraf
+
+# Komut satırı - python member_import.py uyeler.csv [--pasiflestir]
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL dosyasından toplu üye içe aktarma")
+    parser.add_argument("dosya", help="İçe aktarılacak .csv veya .jsonl dosyası")
+    parser.add_argument("--bicim", choices=["csv", "jsonl"], help="Dosya biçimi (varsayılan: uzantıdan)")
+    parser.add_argument("--parti-boyutu", type=int, default=PARTI_BOYUTU, help="Transaction başına satır")
+    parser.add_argument("--pasiflestir", action="store_true", help="Dosyada olmayan üyeleri pasif yap")
+    args = parser.parse_args(argv)
+
+    import asyncio
+    from database import create_tables
+    from cache import invalidate_uye_cache, invalidate_kiralama_cache
+
+    async def cache_temizle():
+        await invalidate_uye_cache()
+        await invalidate_kiralama_cache()
+
+    create_tables()
+    try:
+        with open(args.dosya, "rb") as dosya:
+            rapor = dosyadan_ice_aktar(
+                dosya, args.bicim or bicim_tahmin_et(args.dosya),
+                parti_boyutu=args.parti_boyutu, pasiflestir=args.pasiflestir
+            )
+    finally:
+        # Hata olsa bile önceki partiler commit edilmiş olabilir
+        asyncio.run(cache_temizle())
+
+    json.dump(rapor, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 # SQLAlchemy ORM ile veritabanı tablolarını tanımlar
 # Kitap, Üye ve Kiralama tabloları için model sınıfları
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Text, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -26,6 +26,9 @@ class Kitap(Base):
     kiralanabilir = Column(Boolean, default=True)  # Kitap kiralanabilir mi? Varsayılan: Evet
     olusturma_tarihi = Column(DateTime, default=datetime.utcnow)  # Kayıt tarihi, otomatik
     
+    # Sayaç alanları - Denormalize, yazma endpoint'leri tarafından güncellenir
+    kiralama_sayisi = Column(Integer, nullable=False, default=0, server_default="0", index=True)  # Toplam kiralanma sayısı
+    
     # İlişkiler - Diğer tablolarla bağlantı
     kiralama_gecmisi = relationship("Kiralama", back_populates="kitap")  # Bu kitabın kiralama geçmişi
 
@@ -44,16 +47,24 @@ class Uye(Base):
     uyelik_tarihi = Column(DateTime, default=datetime.utcnow)  # Üyelik tarihi, otomatik
     aktif = Column(Boolean, default=True)  # Üye aktif mi? Varsayılan: Evet
     
+    # Sayaç alanları - Denormalize, yazma endpoint'leri tarafından güncellenir
+    aktif_kiralama_sayisi = Column(Integer, nullable=False, default=0, server_default="0")  # Elindeki kitap sayısı
+    
     # İlişkiler - Diğer tablolarla bağlantı
     kiralama_gecmisi = relationship("Kiralama", back_populates="uye")  # Bu üyenin kiralama geçmişi
+    
+    # İndeksler - Büyük/küçük harf duyarsız e-posta araması (lower(email) = ?)
+    __table_args__ = (
+        Index("ix_uyeler_email_lower", func.lower(email)),
+    )
 
 class Kiralama(Base):
     __tablename__ = "kiralamalar"  # Veritabanı tablo adı
     
     # Ana alanlar - Kiralama bilgileri
     id = Column(Integer, primary_key=True, index=True)  # Birincil anahtar, otomatik artan
-    kitap_id = Column(Integer, ForeignKey("kitaplar.id"), nullable=False)  # Hangi kitap? Zorunlu
-    uye_id = Column(Integer, ForeignKey("uyeler.id"), nullable=False)  # Hangi üye? Zorunlu
+    kitap_id = Column(Integer, ForeignKey("kitaplar.id"), nullable=False, index=True)  # Hangi kitap? Zorunlu
+    uye_id = Column(Integer, ForeignKey("uyeler.id"), nullable=False, index=True)  # Hangi üye? Zorunlu
     
     # Tarih alanları - Kiralama süreci
     kiralama_tarihi = Column(DateTime, default=datetime.utcnow)  # Ne zaman kiralandı? Otomatik
@@ -67,3 +78,39 @@ class Kiralama(Base):
     # İlişkiler - Diğer tablolarla bağlantı
     kitap = relationship("Kitap", back_populates="kiralama_gecmisi")  # Hangi kitap?
     uye = relationship("Uye", back_populates="kiralama_gecmisi")  # Hangi üye?
+
+class Sayac(Base):
+    __tablename__ = "sayaclar"  # Veritabanı tablo adı
+    
+    # Dashboard sayaçları - toplam_kitap, aktif_kiralama, kiralama:2024-05 gibi anahtarlar
+    anahtar = Column(String(50), primary_key=True)  # Sayaç adı, birincil anahtar
+    deger = Column(Integer, nullable=False, default=0)  # Sayaç değeri
+
+class KiralamaArsiv(Base):
+    __tablename__ = "kiralamalar_arsiv"  # Veritabanı tablo adı
+    
+    # Teslim edilmiş eski kiralamalar - kiralamalar tablosu ile aynı kolonlar, id korunur
+    id = Column(Integer, primary_key=True)  # Orijinal kiralama ID'si
+    kitap_id = Column(Integer, nullable=False, index=True)  # Hangi kitap? Kitap silinmiş olabilir
+    uye_id = Column(Integer, nullable=False, index=True)  # Hangi üye? Üye silinmiş olabilir
+    
+    # Tarih alanları - Kiralama süreci
+    kiralama_tarihi = Column(DateTime)  # Ne zaman kiralandı?
+    teslim_tarihi = Column(DateTime, index=True)  # Ne zaman teslim edildi?
+    son_teslim_tarihi = Column(DateTime, nullable=False)  # En son ne zaman teslim edilmeliydi?
+    
+    # Durum alanları - Arşivde her zaman teslim_edildi
+    durum = Column(String(20), default="teslim_edildi")
+    notlar = Column(Text)  # Kiralama notları, opsiyonel
+    arsivlenme_tarihi = Column(DateTime, default=datetime.utcnow)  # Arşive taşınma zamanı
+
+class KiralamaKovasi(Base):
+    __tablename__ = "kiralama_kovalari"  # Veritabanı tablo adı
+    
+    # Analiz kovaları - Gün ve ay başına kitap, yazar ve üye bazında kiralama/teslim sayıları
+    boyut = Column(String(10), primary_key=True)  # kitap, yazar, uye veya toplam
+    periyot = Column(String(3), primary_key=True)  # gun veya ay
+    kova = Column(String(10), primary_key=True)  # 2024-05-17 (gün) veya 2024-05 (ay)
+    anahtar = Column(String(100), primary_key=True)  # Kitap/üye ID'si veya yazar adı, toplam için boş
+    kiralama = Column(Integer, nullable=False, default=0)  # Kovadaki kiralama sayısı
+    teslim = Column(Integer, nullable=False, default=0)  # Kovadaki teslim sayısı
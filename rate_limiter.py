@@ -86,6 +86,10 @@ async def rate_limit_middleware(request: Request, call_next):
     client_ip = get_remote_address(request)
     endpoint = request.url.path
     
+    # Sağlık probe'ları sınırlanmaz - Load balancer saniyede bir yoklayabilir
+    if endpoint.startswith("/api/system/health"):
+        return await call_next(request)
+    
     # Endpoint tipine göre limit belirle
     if "/api/kitaplar" in endpoint and request.method == "POST":
         limit_type = "api_create"
@@ -0,0 +1,160 @@
+# Kütüphane Yönetim Sistemi - Yanıt Optimizasyonu
+# Hızlı JSON serileştirme (orjson / pydantic-core) ve gzip/brotli sıkıştırma
+# Büyük liste yanıtları cache'de önceden sıkıştırılmış olarak saklanır
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+import gzip
+import json
+
+from cache import cache_manager
+
+# Opsiyonel hızlı kütüphaneler - Kurulu değilse standart kütüphaneye düşülür
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Sıkıştırma ayarları
+MIN_SIKISTIRMA_BOYUTU = 1024  # 1 KB altındaki yanıtlar sıkıştırılmaz
+GZIP_SEVIYESI = 6
+BROTLI_SEVIYESI = 5
+SIKISTIRILABILIR_TIPLER = ("application/json", "text/html", "text/css", "text/plain", "application/javascript")
+
+class ORJSONResponse(JSONResponse):
+    """orjson ile serileştiren JSON yanıtı - orjson yoksa standart json kullanılır"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, default=str).encode("utf-8")
+
+# Şema başına TypeAdapter - Oluşturması pahalı olduğu için bir kez kurulur
+_liste_adaptorleri: Dict[type, TypeAdapter] = {}
+
+def _liste_adaptoru(schema: Type) -> TypeAdapter:
+    adaptor = _liste_adaptorleri.get(schema)
+    if adaptor is None:
+        adaptor = _liste_adaptorleri[schema] = TypeAdapter(List[schema])
+    return adaptor
+
+def liste_json(schema: Type, satirlar: List[Any]) -> bytes:
+    """ORM satırlarını pydantic-core ile doğrudan JSON byte'larına çevir (jsonable_encoder atlanır)"""
+    adaptor = _liste_adaptoru(schema)
+    return adaptor.dump_json(adaptor.validate_python(satirlar, from_attributes=True))
+
+def satirlardan_json(schema: Type, sonuc: Iterable) -> bytes:
+    """Core satırlarını (Row) parti parti JSON'a çevir - ORM nesnesi ve identity map oluşmaz
+
+    sonuc yield_per ile çalıştırılmış bir Result ise bellekte aynı anda sadece bir parti satır bulunur.
+    """
+    adaptor = _liste_adaptoru(schema)
+    partiler = sonuc.partitions() if hasattr(sonuc, "partitions") else [list(sonuc)]
+    parcalar = []
+    for parti in partiler:
+        parca = adaptor.dump_json(adaptor.validate_python(parti, from_attributes=True))
+        if len(parca) > 2:
+            parcalar.append(parca[1:-1])  # Dış köşeli parantezler atılır, parçalar virgülle birleşir
+    return b"[" + b",".join(parcalar) + b"]"
+
+def kodlama_sec(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding başlığına göre en iyi kodlamayı seç - brotli > gzip"""
+    kabul = {}
+    for parca in accept_encoding.lower().split(","):
+        ad, _, parametre = parca.strip().partition(";")
+        q = 1.0
+        if parametre.strip().startswith("q="):
+            try:
+                q = float(parametre.strip()[2:])
+            except ValueError:
+                q = 0.0
+        kabul[ad.strip()] = q
+
+    if brotli is not None and kabul.get("br", 0) > 0:
+        return "br"
+    if kabul.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def sikistir(veri: bytes, kodlama: str) -> bytes:
+    """Veriyi verilen kodlama ile sıkıştır"""
+    if kodlama == "br":
+        return brotli.compress(veri, quality=BROTLI_SEVIYESI)
+    return gzip.compress(veri, compresslevel=GZIP_SEVIYESI)
+
+def desteklenen_kodlamalar() -> List[str]:
+    """Sunucunun üretebildiği kodlamalar"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+# Sıkıştırma middleware - Eşik üstündeki yanıtları istemcinin kabul ettiği kodlama ile sıkıştırır
+async def compression_middleware(request: Request, call_next):
+    """gzip/brotli sıkıştırma middleware"""
+    response = await call_next(request)
+
+    kodlama = kodlama_sec(request.headers.get("accept-encoding", ""))
+    icerik_tipi = response.headers.get("content-type", "")
+    if (
+        kodlama is None
+        or "content-encoding" in response.headers
+        or not icerik_tipi.startswith(SIKISTIRILABILIR_TIPLER)
+    ):
+        return response
+
+    # Boyutu bilinen ve eşiğin altında kalan yanıtları okumadan geç
+    icerik_uzunlugu = response.headers.get("content-length")
+    if icerik_uzunlugu is not None and int(icerik_uzunlugu) < MIN_SIKISTIRMA_BOYUTU:
+        return response
+
+    govde = b"".join([parca async for parca in response.body_iterator])
+    basliklar = dict(response.headers)
+    basliklar.pop("content-length", None)
+
+    if len(govde) < MIN_SIKISTIRMA_BOYUTU:
+        return Response(govde, status_code=response.status_code, headers=basliklar, background=response.background)
+
+    basliklar["content-encoding"] = kodlama
+    basliklar["vary"] = "Accept-Encoding"
+    return Response(
+        sikistir(govde, kodlama),
+        status_code=response.status_code,
+        headers=basliklar,
+        background=response.background
+    )
+
+# Cache'lenmiş liste yanıtı - JSON ve sıkıştırılmış halleri birlikte saklanır
+async def onbellekli_json_yaniti(request: Request, anahtar: str, uret: Callable[[], bytes], ttl: int = 300) -> Response:
+    """Cache isabetinde serileştirme ve sıkıştırma tamamen atlanır"""
+    kodlama = kodlama_sec(request.headers.get("accept-encoding", ""))
+
+    if kodlama:
+        sikistirilmis = await cache_manager.get_bytes(f"{anahtar}:{kodlama}")
+        if sikistirilmis is not None:
+            return _json_yaniti(sikistirilmis, kodlama)
+
+    ham = await cache_manager.get_bytes(anahtar)
+    varyantlar = {}
+    if ham is None:
+        # Cache'de yok - Serileştir, sıkıştır ve tüm varyantları kaydet
+        ham = uret()
+        await cache_manager.set_bytes(anahtar, ham, ttl)
+        if len(ham) >= MIN_SIKISTIRMA_BOYUTU:
+            for k in desteklenen_kodlamalar():
+                varyantlar[k] = sikistir(ham, k)
+                await cache_manager.set_bytes(f"{anahtar}:{k}", varyantlar[k], ttl)
+
+    if kodlama is None or len(ham) < MIN_SIKISTIRMA_BOYUTU:
+        return _json_yaniti(ham, None)
+    return _json_yaniti(varyantlar.get(kodlama) or sikistir(ham, kodlama), kodlama)
+
+def _json_yaniti(govde: bytes, kodlama: Optional[str]) -> Response:
+    basliklar = {"Vary": "Accept-Encoding"}
+    if kodlama:
+        basliklar["Content-Encoding"] = kodlama
+    return Response(govde, media_type="application/json", headers=basliklar)
@@ -26,6 +26,7 @@ class Kitap(KitapBase):
     id: int
     kiralanabilir: bool
     olusturma_tarihi: datetime
+    kiralama_sayisi: int = 0
     
     class Config:
         from_attributes = True
@@ -48,10 +49,28 @@ class Uye(UyeBase):
     id: int
     uyelik_tarihi: datetime
     aktif: bool
+    aktif_kiralama_sayisi: int = 0
     
     class Config:
         from_attributes = True
 
+# Toplu üye içe aktarma raporu
+class IceAktarmaHatasi(BaseModel):
+    satir: int  # Dosyadaki satır numarası (1'den başlar, CSV başlığı hariç)
+    email: Optional[str] = None
+    hata: str
+
+class UyeIceAktarmaRaporu(BaseModel):
+    okunan: int
+    eklenen: int
+    guncellenen: int
+    tekrar_eden: int
+    hatali: int
+    pasiflestirilen: int
+    pasiflestirme_atlandi: bool = False  # E-postası okunamayan hatalı satır varsa kimse pasifleştirilmez
+    okuma_hatasi: Optional[str] = None  # Dosya yarıda okunamadıysa (UTF-8 değil, bozuk CSV) nedeni
+    hatalar: List[IceAktarmaHatasi]  # İlk RAPOR_LIMITI hata/tekrar
+
 # Kiralama şemaları
 class KiralamaBase(BaseModel):
     kitap_id: int
@@ -78,3 +97,11 @@ class KiralamaDetay(Kiralama):
     
     class Config:
         from_attributes = True
+
+class KiralamaGecmisi(Kiralama):
+    arsivlendi: bool = False  # Kayıt arşiv tablosundan mı geldi?
+    kitap: Optional[Kitap] = None  # Arşivdeki kiralamanın kitabı silinmiş olabilir
+    uye: Optional[Uye] = None  # Arşivdeki kiralamanın üyesi silinmiş olabilir
+    
+    class Config:
+        from_attributes = True
@@ -245,6 +245,15 @@ function enableAutoSave(formId, interval = 30000) {
     });
 }
 
+// Geciktirilmiş çağrı - Son çağrıdan `bekleme` ms sonra bir kez çalışır (her tuşta istek atılmaz)
+function debounce(fn, bekleme = 300) {
+    let zamanlayici = null;
+    return function(...args) {
+        clearTimeout(zamanlayici);
+        zamanlayici = setTimeout(() => fn.apply(this, args), bekleme);
+    };
+}
+
 // Gelişmiş arama fonksiyonu
 function enableAdvancedSearch(tableId, searchFields = []) {
     const table = document.getElementById(tableId);
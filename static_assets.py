@@ -0,0 +1,116 @@
+# Kütüphane Yönetim Sistemi - Statik Dosya Parmak İzleri
+# Build adımı olmadan içerik hash'li URL'ler (/static/js/app.<hash>.js)
+# Hash'li URL'ler 1 yıl immutable cache'lenir, önceden sıkıştırılmış .gz/.br kardeşleri sunulur
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import mimetypes
+import os
+import logging
+
+from responses import MIN_SIKISTIRMA_BOYUTU, desteklenen_kodlamalar, kodlama_sec, sikistir
+
+HASH_UZUNLUGU = 12
+SIKISTIRILACAK_UZANTILAR = {".css", ".js", ".svg", ".json", ".txt", ".html"}
+KODLAMA_UZANTILARI = {"gzip": ".gz", "br": ".br"}
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+class StaticAssets:
+    """Statik dosyaların içerik hash'leri ve önceden sıkıştırılmış kopyaları"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.hashler: Dict[str, str] = {}  # "js/app.js" -> "3f2a9c..."
+        self.parmak_izli: Dict[str, str] = {}  # "js/app.3f2a9c.js" -> "js/app.js"
+        self.sikistirilmis: Dict[str, Dict[str, str]] = {}  # "js/app.js" -> {"gzip": "js/app.js.gz"}
+
+    def tara(self):
+        """Başlangıçta tüm dosyaları hash'le ve .gz/.br kardeşlerini üret"""
+        self.hashler.clear()
+        self.parmak_izli.clear()
+        self.sikistirilmis.clear()
+
+        for dosya in sorted(self.directory.rglob("*")):
+            if not dosya.is_file() or dosya.suffix in (".gz", ".br"):
+                continue
+
+            goreli = dosya.relative_to(self.directory).as_posix()
+            icerik = dosya.read_bytes()
+            hash_degeri = hashlib.sha256(icerik).hexdigest()[:HASH_UZUNLUGU]
+            self.hashler[goreli] = hash_degeri
+            self.parmak_izli[self._parmak_izli_yol(goreli, hash_degeri)] = goreli
+
+            if dosya.suffix in SIKISTIRILACAK_UZANTILAR and len(icerik) >= MIN_SIKISTIRMA_BOYUTU:
+                self.sikistirilmis[goreli] = self._kardesleri_uret(dosya, goreli, icerik)
+
+        logging.info(f"Statik dosyalar tarandı: {len(self.hashler)} dosya, {len(self.sikistirilmis)} sıkıştırılmış")
+
+    def _kardesleri_uret(self, dosya: Path, goreli: str, icerik: bytes) -> Dict[str, str]:
+        """Kaynak dosyadan eski olan .gz/.br kopyalarını yeniden yaz"""
+        kardesler = {}
+        for kodlama in desteklenen_kodlamalar():
+            uzanti = KODLAMA_UZANTILARI[kodlama]
+            kardes = dosya.with_name(dosya.name + uzanti)
+            try:
+                if not kardes.exists() or kardes.stat().st_mtime < dosya.stat().st_mtime:
+                    kardes.write_bytes(sikistir(icerik, kodlama))
+                kardesler[kodlama] = goreli + uzanti
+            except OSError as e:
+                # Salt okunur dağıtımlarda sıkıştırma middleware'ine bırakılır
+                logging.warning(f"Sıkıştırılmış statik dosya yazılamadı: {kardes} - {e}")
+        return kardesler
+
+    @staticmethod
+    def _parmak_izli_yol(goreli: str, hash_degeri: str) -> str:
+        """js/app.js -> js/app.<hash>.js"""
+        klasor, _, ad = goreli.rpartition("/")
+        kok, nokta, uzanti = ad.rpartition(".")
+        yeni_ad = f"{kok}.{hash_degeri}.{uzanti}" if nokta else f"{ad}.{hash_degeri}"
+        return f"{klasor}/{yeni_ad}" if klasor else yeni_ad
+
+    def url(self, goreli: str) -> str:
+        """Jinja yardımcısı - Hash'li URL döner, bilinmeyen dosyalar için düz URL"""
+        goreli = goreli.lstrip("/")
+        hash_degeri = self.hashler.get(goreli)
+        if hash_degeri is None:
+            return f"/static/{goreli}"
+        return f"/static/{self._parmak_izli_yol(goreli, hash_degeri)}"
+
+    def orijinal_yol(self, yol: str) -> Optional[str]:
+        """Hash'li yoldan orijinal dosya yolunu bul - Hash güncel değilse None"""
+        return self.parmak_izli.get(yol)
+
+class FingerprintedStaticFiles(StaticFiles):
+    """Hash'li URL'leri immutable cache ve önceden sıkıştırılmış kopyalarla sunan StaticFiles"""
+
+    def __init__(self, *args, assets: StaticAssets, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        orijinal = self.assets.orijinal_yol(path.replace(os.sep, "/"))
+        if orijinal is None:
+            # Hash'siz URL - İçerik değişebilir, her seferinde doğrulansın
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("Cache-Control", "no-cache")
+            return response
+
+        response = await super().get_response(orijinal, scope)
+
+        kodlama = kodlama_sec(Headers(scope=scope).get("accept-encoding", ""))
+        kardes = self.assets.sikistirilmis.get(orijinal, {}).get(kodlama)
+        if kardes is not None and isinstance(response, FileResponse):
+            full_path, stat_result = self.lookup_path(kardes)
+            if stat_result is not None:
+                media_type = mimetypes.guess_type(orijinal)[0] or "application/octet-stream"
+                response = FileResponse(full_path, stat_result=stat_result, media_type=media_type)
+                response.headers["Content-Encoding"] = kodlama
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
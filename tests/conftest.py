@@ -0,0 +1,36 @@
+# Kütüphane Yönetim Sistemi - Test Ayarları
+# Testler geçici bir SQLite dosyası ve geçici log klasörü ile çalışır - kutuphane.db'ye dokunulmaz
+# Redis zorunlu değildir; cache hataları uygulama tarafından yakalanır
+
+from pathlib import Path
+import os
+import sys
+import tempfile
+
+import pytest
+
+PROJE_KOKU = Path(__file__).resolve().parent.parent
+TEST_KLASORU = Path(tempfile.mkdtemp(prefix="kutuphane_test_"))
+
+# Uygulama modülleri import edilmeden önce - database.py engine'i import anında kurar
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_KLASORU / 'test.db'}"
+os.chdir(PROJE_KOKU)  # templates/ ve static/ göreli yollarla okunur
+sys.path.insert(0, str(PROJE_KOKU))
+
+import cache  # noqa: E402
+import logging_config  # noqa: E402
+from redis.backoff import NoBackoff  # noqa: E402
+from redis.retry import Retry  # noqa: E402
+
+logging_config.log_dir = TEST_KLASORU / "logs"
+# Redis çalışmıyorsa her cache çağrısı yeniden denemelerle ~4 sn bekler - Testlerde tek deneme yeterli
+cache.REDIS_AYARLARI["retry"] = Retry(NoBackoff(), 0)
+
+@pytest.fixture(scope="session")
+def client():
+    """Lifespan'i çalıştırılmış uygulama istemcisi - Tüm testler aynı veritabanını paylaşır"""
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as istemci:
+        yield istemci
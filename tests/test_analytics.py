@@ -0,0 +1,162 @@
+# Kütüphane Yönetim Sistemi - Kiralama Analizi Testleri
+# Kova tabanlı pencere sorguları, kiralamaları tek tek sayan kaba kuvvet hesabıyla karşılaştırılır
+# Sentetik geçmiş ayrı bir veritabanında üretilir - Diğer testlerin kiralamaları sayımları etkilemez
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session
+
+import analytics
+from models import Base, Kitap, Uye, Kiralama, KiralamaArsiv, KiralamaKovasi
+
+GECMIS_GUN = 700  # Günlük saklama süresinden (varsayılan 400) uzun - Ay kovası yedeği de sınanır
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    """Sentetik geçmiş - Kovalar endpoint'lerdeki gibi olay başına, eski günlük kovalar arşiv işindeki gibi silinir"""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('analiz') / 'analiz.db'}")
+    Base.metadata.create_all(engine)
+    rastgele = random.Random(42)
+    bugun = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+
+    with Session(engine) as oturum:
+        yazarlar = [f"Yazar {i}" for i in range(8)]
+        oturum.execute(insert(Kitap), [{"baslik": f"Kitap {i}", "yazar": yazarlar[i % 8]} for i in range(30)])
+        oturum.execute(insert(Uye), [{"ad": "Üye", "soyad": str(i), "email": f"u{i}@x.com"} for i in range(20)])
+        kitaplar = oturum.execute(select(Kitap.id, Kitap.yazar)).all()
+        uye_idleri = oturum.scalars(select(Uye.id)).all()
+
+        for kiralama_id in range(1, 1501):
+            kitap = rastgele.choice(kitaplar)
+            uye_id = rastgele.choice(uye_idleri)
+            kiralama_tarihi = bugun - timedelta(days=rastgele.randrange(GECMIS_GUN))
+            teslim_tarihi = kiralama_tarihi + timedelta(days=rastgele.randrange(21))
+            teslim_tarihi = teslim_tarihi if teslim_tarihi <= bugun and rastgele.random() < 0.8 else None
+
+            # Eski teslim edilmiş kiralamalar arşivde - Yeniden oluşturma iki tabloyu birlikte okur
+            tablo = KiralamaArsiv if teslim_tarihi and teslim_tarihi < bugun - timedelta(days=300) else Kiralama
+            oturum.execute(insert(tablo).values(
+                id=kiralama_id, kitap_id=kitap.id, uye_id=uye_id,
+                kiralama_tarihi=kiralama_tarihi, teslim_tarihi=teslim_tarihi,
+                son_teslim_tarihi=kiralama_tarihi + timedelta(days=14),
+                durum="teslim_edildi" if teslim_tarihi else "aktif"
+            ))
+            analytics.kitap_kiralandi(oturum, kitap.id, kitap.yazar, uye_id, kiralama_tarihi)
+            if teslim_tarihi:
+                analytics.kitap_teslim_edildi(oturum, kitap.id, kitap.yazar, uye_id, teslim_tarihi)
+        oturum.commit()
+        analytics.eski_kovalari_temizle(oturum)
+        yield oturum
+
+def _olaylar(db):
+    """Tüm kiralamalar - (kitap_id, yazar, uye_id, kiralama günü, teslim günü)"""
+    yazarlar = dict(db.execute(select(Kitap.id, Kitap.yazar)).all())
+    return [
+        (kitap_id, yazarlar.get(kitap_id), uye_id, kiralama.date(), teslim.date() if teslim else None)
+        for tablo in (Kiralama, KiralamaArsiv)
+        for kitap_id, uye_id, kiralama, teslim in db.execute(
+            select(tablo.kitap_id, tablo.uye_id, tablo.kiralama_tarihi, tablo.teslim_tarihi)
+        )
+    ]
+
+def _kaba_populer(db, boyut: str, baslangic: date, bitis: date) -> Counter:
+    sira = {"kitap": 0, "yazar": 1, "uye": 2}[boyut]
+    return Counter(olay[sira] for olay in _olaylar(db) if baslangic <= olay[3] <= bitis)
+
+def _populer(db, boyut: str, baslangic: date, bitis: date) -> Counter:
+    alan = {"kitap": "kitap_id", "yazar": "yazar", "uye": "uye_id"}[boyut]
+    return Counter({satir[alan]: satir["kiralama"] for satir in analytics.populer(db, boyut, baslangic, bitis, limit=1000)})
+
+def _gunluk_sinir() -> date:
+    return datetime.utcnow().date() - timedelta(days=analytics.GUNLUK_SAKLAMA_GUN)
+
+@pytest.mark.parametrize("boyut", analytics.BOYUTLAR)
+@pytest.mark.parametrize("gun_once, gun", [(0, 1), (0, 30), (3, 45), (17, 100), (0, 365)])
+def test_populer_kaba_kuvvet_sayimiyla_ayni(db, boyut, gun_once, gun):
+    # Kısmi başlangıç ve bitiş ayları gün kovalarından, aradaki tam aylar ay kovalarından
+    bitis = datetime.utcnow().date() - timedelta(days=gun_once)
+    baslangic, bitis = analytics.pencere(gun, bitis=bitis)
+    assert _populer(db, boyut, baslangic, bitis) == _kaba_populer(db, boyut, baslangic, bitis)
+
+def test_saklama_suresi_disindaki_kismi_ay_tam_ay_sayilir(db):
+    # Günlük kovası silinmiş ayın ortasından başlayan pencere - O ayın tamamı sayılır
+    sinir = _gunluk_sinir()
+    baslangic = (sinir - timedelta(days=60)).replace(day=15)
+    bitis = datetime.utcnow().date()
+
+    sonuc = _populer(db, "kitap", baslangic, bitis)
+    assert sonuc == _kaba_populer(db, "kitap", baslangic.replace(day=1), bitis)
+    assert sum(sonuc.values()) > sum(_kaba_populer(db, "kitap", baslangic, bitis).values())
+
+    # Günlük kovalar gerçekten silinmiş olmalı - Aksi halde yedek yol sınanmaz
+    en_eski_gun = db.scalar(select(KiralamaKovasi.kova).where(KiralamaKovasi.periyot == "gun").order_by(KiralamaKovasi.kova))
+    assert en_eski_gun >= sinir.isoformat()
+
+def test_trend_bos_gunleri_sifirla_doldurur(db):
+    baslangic, bitis = analytics.pencere(90)
+    noktalar = analytics.trend(db, baslangic, bitis, "gun")
+
+    olaylar = _olaylar(db)
+    kiralama = Counter(olay[3] for olay in olaylar)
+    teslim = Counter(olay[4] for olay in olaylar if olay[4])
+    gunler = [baslangic + timedelta(days=i) for i in range((bitis - baslangic).days + 1)]
+    assert noktalar == [
+        {"kova": gun.isoformat(), "kiralama": kiralama[gun], "teslim": teslim[gun]} for gun in gunler
+    ]
+    # 1500 kiralama 700 güne dağıldı - Pencerede kiralamasız günler de olmalı
+    assert any(nokta["kiralama"] == 0 for nokta in noktalar)
+
+def test_aylik_trend_ay_kovalarindan(db):
+    baslangic = (datetime.utcnow().date() - timedelta(days=GECMIS_GUN)).replace(day=1)
+    noktalar = analytics.trend(db, baslangic, datetime.utcnow().date(), "ay")
+
+    kiralama = Counter(olay[3].strftime("%Y-%m") for olay in _olaylar(db))
+    assert [nokta["kova"] for nokta in noktalar][0] == baslangic.strftime("%Y-%m")
+    assert {nokta["kova"]: nokta["kiralama"] for nokta in noktalar} == {
+        nokta["kova"]: kiralama[nokta["kova"]] for nokta in noktalar
+    }
+
+def test_uzlastirma_kovalari_kaynak_tablolardan_ayni_sekilde_kurar(db):
+    def kovalar():
+        return set(db.execute(select(KiralamaKovasi.__table__)).all())
+
+    artimli = kovalar()
+    assert not analytics.kovalari_uzlastir(db)["duzeltildi"]
+
+    # Kovası olmayan eski veritabanı - Uzlaştırma aynı kovaları INSERT ... SELECT ile üretmeli
+    db.execute(delete(KiralamaKovasi))
+    db.commit()
+    assert analytics.kovalari_uzlastir(db)["duzeltildi"]
+    assert kovalar() == artimli
+
+def test_kiralama_ve_teslim_kovalari_artirir(client):
+    from database import SessionLocal
+
+    yazar = f"Kova Yazarı {random.randrange(10**6)}"
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Kova", "yazar": yazar}).json()["id"]
+    uye_id = client.post("/api/uyeler", json={"ad": "Kova", "soyad": "Üye", "email": f"kova{kitap_id}-{random.randrange(10**6)}@x.com"}).json()["id"]
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+
+    def kovalar():
+        with SessionLocal() as oturum:
+            return {
+                (boyut, periyot): (kiralama, teslim)
+                for boyut, periyot, kiralama, teslim in oturum.execute(
+                    select(KiralamaKovasi.boyut, KiralamaKovasi.periyot, KiralamaKovasi.kiralama, KiralamaKovasi.teslim)
+                    .where(KiralamaKovasi.anahtar.in_([str(kitap_id), yazar]), KiralamaKovasi.boyut.in_(["kitap", "yazar"]))
+                )
+            }
+
+    kiralama_id = client.post("/api/kiralamalar", json={"kitap_id": kitap_id, "uye_id": uye_id, "son_teslim_tarihi": son_teslim}).json()["id"]
+    assert kovalar() == {(boyut, periyot): (1, 0) for boyut in ("kitap", "yazar") for periyot in ("gun", "ay")}
+
+    client.put(f"/api/kiralamalar/{kiralama_id}/teslim")
+    assert kovalar() == {(boyut, periyot): (1, 1) for boyut in ("kitap", "yazar") for periyot in ("gun", "ay")}
+
+    # Uç noktadan bakıldığında - Bugünün popüler yazarları arasında
+    populer = client.get("/api/reports/populer", params={"boyut": "yazar", "gun": 1, "limit": 100}).json()["sonuclar"]
+    assert {"yazar": yazar, "kiralama": 1} in populer
@@ -0,0 +1,57 @@
+# Kütüphane Yönetim Sistemi - Kiralama Arşivi Testleri
+# Teslimi eski kiralamalar arşive taşınır, geçmiş iki tabloyu birlikte gösterir
+# Teslim tarihleri doğrudan veritabanında geriye alınır - Arşiv işi aynı fonksiyonla çalıştırılır
+
+from datetime import datetime, timedelta
+import uuid
+
+from sqlalchemy import select, update
+
+import archive
+from database import SessionLocal
+from models import Kiralama, KiralamaArsiv
+
+def _kirala_ve_teslim_et(client, kitap_id, uye_id) -> int:
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+    kiralama_id = client.post("/api/kiralamalar", json={"kitap_id": kitap_id, "uye_id": uye_id, "son_teslim_tarihi": son_teslim}).json()["id"]
+    assert client.put(f"/api/kiralamalar/{kiralama_id}/teslim").status_code == 200
+    return kiralama_id
+
+def test_eski_teslimler_arsivlenir_ve_gecmiste_gorunur(client):
+    uye_id = client.post("/api/uyeler", json={"ad": "Arşiv", "soyad": "Üye", "email": f"{uuid.uuid4().hex[:8]}@x.com"}).json()["id"]
+    silinecek = client.post("/api/kitaplar", json={"baslik": "Silinecek", "yazar": "Yazar"}).json()["id"]
+    kalan = client.post("/api/kitaplar", json={"baslik": "Kalan", "yazar": "Yazar"}).json()["id"]
+    idler = [
+        _kirala_ve_teslim_et(client, silinecek, uye_id),
+        _kirala_ve_teslim_et(client, kalan, uye_id),
+        _kirala_ve_teslim_et(client, kalan, uye_id),
+    ]
+
+    with SessionLocal() as db:
+        db.execute(
+            update(Kiralama).where(Kiralama.id.in_(idler))
+            .values(teslim_tarihi=datetime.utcnow() - timedelta(days=200))
+        )
+        db.commit()
+        # Geriye alınan teslimler aylık sayaçları kaydırır - Arşivden önce temiz başlangıç
+        assert client.post("/api/system/counters/reconcile").status_code == 200
+        sonuc = archive.kiralamalari_arsivle(db, gun=180, parti_boyutu=1)
+
+        # En büyük id sıcak tabloda kalır - SQLite silinen en büyük id'yi yeniden kullanmasın
+        assert sonuc["arsivlenen"] >= 2
+        assert set(db.scalars(select(KiralamaArsiv.id).where(KiralamaArsiv.id.in_(idler)))) == set(idler[:2])
+        assert list(db.scalars(select(Kiralama.id).where(Kiralama.id.in_(idler)))) == idler[2:]
+
+    # Sıcak tabloda kiralaması kalmayan kitap silinebilir - Arşiv satırı kitapsız kalır
+    assert client.delete(f"/api/kitaplar/{silinecek}").status_code == 200
+
+    gecmis = client.get("/api/kiralamalar/gecmis", params={"uye_id": uye_id}).json()
+    assert sorted((k["id"], k["arsivlendi"]) for k in gecmis) == [(idler[0], True), (idler[1], True), (idler[2], False)]
+    kitapsiz = client.get("/api/kiralamalar/gecmis", params={"kitap_id": silinecek}).json()
+    assert [(k["id"], k["arsivlendi"], k["kitap"]) for k in kitapsiz] == [(idler[0], True, None)]
+    assert kitapsiz[0]["uye"]["id"] == uye_id
+
+    # Aylık kiralama/teslim ve kitap kiralama sayıları arşivi de sayar - Taşıma fark yaratmaz
+    uzlastirma = client.post("/api/system/counters/reconcile", params={"duzelt": False}).json()
+    assert (uzlastirma["farklar"], uzlastirma["kitap_farki"], uzlastirma["uye_farki"]) == ({}, 0, 0)
+    assert client.get(f"/api/kitaplar/{kalan}").json()["kiralama_sayisi"] == 2
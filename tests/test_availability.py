@@ -0,0 +1,68 @@
+# Kütüphane Yönetim Sistemi - Müsaitlik İndeksi Testleri
+# Başka bir worker'ın yazmaları ayrı bir oturumla doğrudan veritabanına yapılır
+# Bu worker'ın indeksi o yazmaları görmese de kiralama ve müsait listesi doğru kalmalı
+
+from datetime import datetime, timedelta
+import uuid
+
+from sqlalchemy import update
+
+import counters
+from availability import musaitlik_indeksi
+from database import SessionLocal
+from models import Kiralama, Kitap
+
+def _uye(client):
+    return client.post("/api/uyeler", json={"ad": "Ece", "soyad": "Ak", "email": f"{uuid.uuid4().hex[:8]}@x.com"}).json()["id"]
+
+def _kirala(client, kitap_id, uye_id):
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+    return client.post("/api/kiralamalar", json={"kitap_id": kitap_id, "uye_id": uye_id, "son_teslim_tarihi": son_teslim})
+
+def _baska_worker_kitap_ekler() -> int:
+    with SessionLocal() as db:
+        kitap = Kitap(baslik="Başka worker", yazar="Yazar")
+        db.add(kitap)
+        counters.kitap_eklendi(db, kitap)
+        counters.surum_artir(db, "kitaplar")
+        db.commit()
+        return kitap.id
+
+def test_kendi_yazmalarinda_indeks_guncel_kalir(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Aynı worker", "yazar": "Yazar"}).json()["id"]
+    kiralama = _kirala(client, kitap_id, _uye(client))
+    assert kiralama.status_code == 200
+    client.put(f"/api/kiralamalar/{kiralama.json()['id']}/teslim")
+
+    with SessionLocal() as db:
+        assert musaitlik_indeksi.guncel_mi(db)
+    assert musaitlik_indeksi.musait_mi(kitap_id) is True
+
+def test_baska_workerin_ekledigi_kitap_kiralanabilir(client):
+    kitap_id = _baska_worker_kitap_ekler()
+    assert musaitlik_indeksi.musait_mi(kitap_id) is None  # Bu worker'ın indeksi görmedi
+
+    assert _kirala(client, kitap_id, _uye(client)).status_code == 200
+
+def test_baska_workerda_teslim_edilen_kitap_tekrar_kiralanabilir(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Teslim", "yazar": "Yazar"}).json()["id"]
+    kiralama_id = _kirala(client, kitap_id, _uye(client)).json()["id"]
+
+    with SessionLocal() as db:
+        db.execute(update(Kiralama).where(Kiralama.id == kiralama_id).values(durum="teslim_edildi", teslim_tarihi=datetime.utcnow()))
+        db.execute(update(Kitap).where(Kitap.id == kitap_id).values(kiralanabilir=True))
+        counters.surum_artir(db, "kiralamalar", "kitaplar")
+        db.commit()
+    assert musaitlik_indeksi.musait_mi(kitap_id) is False
+
+    assert _kirala(client, kitap_id, _uye(client)).status_code == 200
+
+def test_musait_listesi_baska_workerin_yazmasini_gorur(client):
+    kitap_id = _baska_worker_kitap_ekler()
+    assert kitap_id in client.get("/api/kitaplar/musait").json()
+
+def test_kiralanmis_kitap_reddedilir(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Dolu", "yazar": "Yazar"}).json()["id"]
+    assert _kirala(client, kitap_id, _uye(client)).status_code == 200
+    assert _kirala(client, kitap_id, _uye(client)).status_code == 400
+    assert _kirala(client, 10**9, _uye(client)).status_code == 404
@@ -0,0 +1,62 @@
+# Kütüphane Yönetim Sistemi - Sayaç Uzlaştırma Testleri
+# Satır sayaçları bozulduğunda uzlaştırma düzeltir; sorgu planında satır başına alt sorgu olmamalı
+# Açılışta tam uzlaştırma sadece sayaç tablosu boşken çalışır
+
+from datetime import datetime, timedelta
+import uuid
+
+from sqlalchemy import event, text, update
+
+import counters
+from database import SessionLocal, engine
+from models import Kitap, Uye
+
+def _kirala(client, kitap_id):
+    uye_id = client.post("/api/uyeler", json={"ad": "Can", "soyad": "Ay", "email": f"{uuid.uuid4().hex[:8]}@x.com"}).json()["id"]
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+    yanit = client.post("/api/kiralamalar", json={"kitap_id": kitap_id, "uye_id": uye_id, "son_teslim_tarihi": son_teslim})
+    assert yanit.status_code == 200
+    return uye_id
+
+def test_bozulan_satir_sayaclari_duzeltilir(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Sayaç", "yazar": "Yazar"}).json()["id"]
+    uye_id = _kirala(client, kitap_id)
+    client.post("/api/system/counters/reconcile")  # Önceki testlerin doğrudan yazmaları - Temiz başlangıç
+
+    with SessionLocal() as db:
+        db.execute(update(Kitap).where(Kitap.id == kitap_id).values(kiralama_sayisi=7))
+        db.execute(update(Uye).where(Uye.id == uye_id).values(aktif_kiralama_sayisi=0))
+        db.commit()
+
+    sonuc = client.post("/api/system/counters/reconcile").json()
+    assert sonuc["kitap_farki"] == 1 and sonuc["uye_farki"] == 1
+
+    with SessionLocal() as db:
+        assert db.get(Kitap, kitap_id).kiralama_sayisi == 1
+        assert db.get(Uye, uye_id).aktif_kiralama_sayisi == 1
+    sonuc = client.post("/api/system/counters/reconcile", params={"duzelt": False}).json()
+    assert (sonuc["farklar"], sonuc["kitap_farki"], sonuc["uye_farki"]) == ({}, 0, 0)
+
+def test_uzlastirma_satir_basina_alt_sorgu_calistirmaz(client):
+    ifadeler = []
+    def yakala(conn, cursor, ifade, parametreler, context, executemany):
+        if ifade.lstrip().upper().startswith("SELECT"):
+            ifadeler.append((ifade, parametreler))
+
+    event.listen(engine, "before_cursor_execute", yakala)
+    try:
+        with SessionLocal() as db:
+            counters.sayaclari_uzlastir(db, duzelt=False)
+    finally:
+        event.remove(engine, "before_cursor_execute", yakala)
+
+    with engine.connect() as conn:
+        for ifade, parametreler in ifadeler:
+            plan = " ".join(satir[-1] for satir in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {ifade}", parametreler))
+            assert "CORRELATED" not in plan, ifade
+
+def test_dolu_sayaclar_acilista_taranmaz(client):
+    with SessionLocal() as db:
+        assert not counters.sayaclar_bos_mu(db)
+        indeksler = set(db.scalars(text("SELECT name FROM sqlite_master WHERE tbl_name = 'kiralamalar'")))
+    assert {"ix_kiralamalar_kitap_id", "ix_kiralamalar_uye_id"} <= indeksler
@@ -0,0 +1,18 @@
+# Kütüphane Yönetim Sistemi - Kitap API Testleri
+# Sayfalı liste ve sıralama - Dashboard son eklenen kitapları bu yolla alır
+# Diğer testler de kitap eklediği için sadece göreli sıra kontrol edilir
+
+def test_son_eklenen_kitaplar_en_yeni_once(client):
+    idler = [client.post("/api/kitaplar", json={"baslik": f"Sıra {i}", "yazar": "Yazar"}).json()["id"] for i in range(3)]
+
+    yanit = client.get("/api/kitaplar", params={"limit": 2, "siralama": "-id"})
+    assert yanit.status_code == 200
+    assert [kitap["id"] for kitap in yanit.json()] == idler[:0:-1]
+
+def test_gecersiz_siralama_reddedilir(client):
+    assert client.get("/api/kitaplar", params={"siralama": "baslik"}).status_code == 422
+
+def test_arama_istekleri_saatlik_100_sinirina_takilmaz(client):
+    # Arama kutusu, dashboard ve kiralama seçicisi aynı endpoint'i çağırır
+    durumlar = {client.get("/api/kitaplar", params={"q": f"ara{i}", "limit": 5}).status_code for i in range(120)}
+    assert durumlar == {200}
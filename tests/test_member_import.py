@@ -0,0 +1,84 @@
+# Kütüphane Yönetim Sistemi - Toplu Üye İçe Aktarma Testleri
+# Mevcut üyelerin güncellenmesi ve pasifleştirme kuralları
+# Dosyalar bellekte oluşturulur, içe aktarma API üzerinden yapılır
+
+import io
+import uuid
+
+import counters
+from database import SessionLocal
+
+def _ice_aktar(client, icerik: str, **parametreler):
+    yanit = client.post(
+        "/api/uyeler/ice-aktar", params=parametreler,
+        files={"dosya": ("uyeler.csv", io.BytesIO(icerik.encode("utf-8")), "text/csv")}
+    )
+    assert yanit.status_code == 200, yanit.text
+    return yanit.json()
+
+def _uye(client, email: str):
+    return next(u for u in client.get("/api/uyeler", params={"q": email, "limit": 100}).json() if u["email"] == email)
+
+def test_eksik_iletisim_bilgisi_mevcut_degeri_silmez(client):
+    email = f"{uuid.uuid4().hex[:8]}@okul.edu"
+    client.post("/api/uyeler", json={
+        "ad": "Ayşe", "soyad": "Kaya", "email": email, "telefon": "5551234567", "adres": "Kadıköy"
+    })
+
+    # telefon kolonu yok, adres hücresi boş
+    rapor = _ice_aktar(client, f"ad,soyad,email,adres\nAyşe,Yılmaz,{email.upper()},\n")
+    assert rapor["guncellenen"] == 1
+
+    uye = _uye(client, email)
+    assert uye["soyad"] == "Yılmaz"
+    assert uye["telefon"] == "5551234567"
+    assert uye["adres"] == "Kadıköy"
+
+def test_hatali_satirdaki_uye_pasiflestirilmez(client):
+    etiket = uuid.uuid4().hex[:8]
+    gecerli, hatali, eksik = (f"{ad}-{etiket}@okul.edu" for ad in ("gecerli", "hatali", "eksik"))
+    for email in (gecerli, hatali, eksik):
+        client.post("/api/uyeler", json={"ad": "Ali", "soyad": "Demir", "email": email})
+
+    # hatali: soyad boş (doğrulama hatası), eksik: dosyada yok
+    rapor = _ice_aktar(client, f"ad,soyad,email\nAli,Demir,{gecerli}\nAli,,{hatali}\n", pasiflestir=True)
+    assert rapor["hatali"] == 1
+    assert not rapor["pasiflestirme_atlandi"]
+
+    assert _uye(client, gecerli)["aktif"]
+    assert _uye(client, hatali)["aktif"]
+    assert not _uye(client, eksik)["aktif"]
+
+def test_email_okunamayan_hatali_satir_pasiflestirmeyi_atlar(client):
+    email = f"{uuid.uuid4().hex[:8]}@okul.edu"
+    client.post("/api/uyeler", json={"ad": "Can", "soyad": "Öz", "email": email})
+
+    rapor = _ice_aktar(client, "ad,soyad,email\nCan,Öz,\n", pasiflestir=True)
+    assert rapor["pasiflestirme_atlandi"]
+    assert rapor["pasiflestirilen"] == 0
+    assert _uye(client, email)["aktif"]
+
+def test_utf8_olmayan_dosya_okunan_partileri_yazar_ve_raporlar(client):
+    etiket = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        onceki_surum = counters.sayaclari_getir(db, [f"{counters.SURUM}:uyeler"])[f"{counters.SURUM}:uyeler"]
+
+    # İlk 8 KB'tan sonra Windows-1254 baytı (ş = 0xFE) - Önceki partiler commit edilmiş olur
+    satirlar = [f"Ali,Demir,{etiket}-{i}@okul.edu" for i in range(300)] + ["Ayşe,Kaya,ayse@okul.edu"]
+    icerik = ("ad,soyad,email\n" + "\n".join(satirlar) + "\n").encode("cp1254")
+    yanit = client.post(
+        "/api/uyeler/ice-aktar", params={"parti_boyutu": 100, "pasiflestir": True},
+        files={"dosya": ("uyeler.csv", io.BytesIO(icerik), "text/csv")}
+    )
+    assert yanit.status_code == 200, yanit.text
+    rapor = yanit.json()
+    assert rapor["okuma_hatasi"] and "UTF-8" in rapor["okuma_hatasi"]
+    assert rapor["pasiflestirme_atlandi"]
+    assert rapor["pasiflestirilen"] == 0
+    assert rapor["eklenen"] >= 100
+
+    # Commit edilen her parti sürümü artırdı - Sürüme bağlı liste fragment'leri eskimez
+    with SessionLocal() as db:
+        surum = counters.sayaclari_getir(db, [f"{counters.SURUM}:uyeler"])[f"{counters.SURUM}:uyeler"]
+    assert surum - onceki_surum == -(-rapor["eklenen"] // 100)  # Okuma hatasından sonra kalan parti de yazılır
+    assert _uye(client, f"{etiket}-0@okul.edu")["aktif"]
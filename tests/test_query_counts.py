@@ -0,0 +1,101 @@
+# Kütüphane Yönetim Sistemi - Sorgu Sayısı Testleri
+# Yazma endpoint'lerinin istek başına çalıştırdığı SQL ifadesi sayısı sabit kalmalı
+# before_cursor_execute dinleyicisi ile sayılır - Yeni bir SELECT/refresh eklenirse test kırılır
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from database import engine
+
+# Sağlık izleyicisi arka planda kendi bağlantısıyla bu ifadeyi çalıştırır - İstekten bağımsızdır
+ARKA_PLAN_IFADELERI = {"SELECT 1"}
+
+@contextmanager
+def ifade_sayaci():
+    ifadeler = []
+
+    def kaydet(conn, cursor, statement, parameters, context, executemany):
+        if statement not in ARKA_PLAN_IFADELERI:
+            ifadeler.append(statement)
+
+    event.listen(engine, "before_cursor_execute", kaydet)
+    try:
+        yield ifadeler
+    finally:
+        event.remove(engine, "before_cursor_execute", kaydet)
+
+def _say(istek):
+    with ifade_sayaci() as ifadeler:
+        yanit = istek()
+    assert yanit.status_code == 200, yanit.text
+    return yanit, ifadeler
+
+@pytest.fixture
+def kitap_ve_uye(client):
+    etiket = uuid.uuid4().hex[:8]
+    kitap = client.post("/api/kitaplar", json={"baslik": f"Sayım {etiket}", "yazar": "Yazar"}).json()
+    uye = client.post("/api/uyeler", json={"ad": "Sayım", "soyad": "Testi", "email": f"{etiket}@sayim.com"}).json()
+    return kitap, uye
+
+def test_kitap_ekle(client):
+    _, ifadeler = _say(lambda: client.post("/api/kitaplar", json={"baslik": "Yeni", "yazar": "Yazar"}))
+    assert len(ifadeler) == 3, ifadeler
+
+def test_kitap_guncelle(client, kitap_ve_uye):
+    kitap, _ = kitap_ve_uye
+    _, ifadeler = _say(lambda: client.put(f"/api/kitaplar/{kitap['id']}", json={"baslik": "Değişti", "yazar": "Yazar"}))
+    assert len(ifadeler) == 3, ifadeler
+
+def test_uye_ekle(client):
+    email = f"{uuid.uuid4().hex[:8]}@sayim.com"
+    _, ifadeler = _say(lambda: client.post("/api/uyeler", json={"ad": "Yeni", "soyad": "Üye", "email": email}))
+    assert len(ifadeler) == 4, ifadeler
+
+def test_uye_guncelle(client, kitap_ve_uye):
+    _, uye = kitap_ve_uye
+    govde = {"ad": "Değişti", "soyad": uye["soyad"], "email": uye["email"]}
+    _, ifadeler = _say(lambda: client.put(f"/api/uyeler/{uye['id']}", json=govde))
+    assert len(ifadeler) == 3, ifadeler
+
+def test_kiralama_ve_teslim(client, kitap_ve_uye):
+    kitap, uye = kitap_ve_uye
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+    yanit, ifadeler = _say(lambda: client.post(
+        "/api/kiralamalar", json={"kitap_id": kitap["id"], "uye_id": uye["id"], "son_teslim_tarihi": son_teslim}
+    ))
+    assert len(ifadeler) == 7, ifadeler
+
+    _, ifadeler = _say(lambda: client.put(f"/api/kiralamalar/{yanit.json()['id']}/teslim"))
+    assert len(ifadeler) == 6, ifadeler
+
+def test_indeks_on_kontrolu_yazmadan_reddeder(client, kitap_ve_uye):
+    """Kiralanmış kitap: sadece sürüm okuması, UPDATE/INSERT yok"""
+    kitap, uye = kitap_ve_uye
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+    govde = {"kitap_id": kitap["id"], "uye_id": uye["id"], "son_teslim_tarihi": son_teslim}
+    assert client.post("/api/kiralamalar", json=govde).status_code == 200
+    client.get("/api/kitaplar/musait")  # Önceki testler indeksi eskitmiş olabilir - Müsait listesi yeniden yükler
+
+    with ifade_sayaci() as ifadeler:
+        assert client.post("/api/kiralamalar", json=govde).status_code == 400
+    assert len(ifadeler) == 1, ifadeler
+
+def test_kiralama_listesi_satir_sayisindan_bagimsiz(client):
+    """Tam kiralama listesi kitap/üye ilişkilerini satır başına ayrı sorguyla yüklememeli (N+1)"""
+    def kiralama_ekle(adet):
+        son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+        for _ in range(adet):
+            etiket = uuid.uuid4().hex[:8]
+            kitap = client.post("/api/kitaplar", json={"baslik": f"Liste {etiket}", "yazar": "Yazar"}).json()
+            uye = client.post("/api/uyeler", json={"ad": "Liste", "soyad": "Testi", "email": f"{etiket}@liste.com"}).json()
+            client.post("/api/kiralamalar", json={"kitap_id": kitap["id"], "uye_id": uye["id"], "son_teslim_tarihi": son_teslim})
+
+    kiralama_ekle(2)
+    _, once = _say(lambda: client.get("/api/kiralamalar"))
+    kiralama_ekle(3)
+    _, sonra = _say(lambda: client.get("/api/kiralamalar"))
+    assert len(sonra) == len(once) == 1, sonra
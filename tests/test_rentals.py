@@ -0,0 +1,66 @@
+# Kütüphane Yönetim Sistemi - Kiralama Testleri
+# Koşullu UPDATE ... RETURNING kuralları ve teslimde sayaç tutarlılığı
+# İndeks bilerek eski bırakılarak veritabanı yolunun tek başına doğru karar verdiği sınanır
+
+from datetime import datetime, timedelta
+import uuid
+
+from sqlalchemy import delete
+
+import counters
+from database import SessionLocal
+from models import Kitap
+
+def _uye(client):
+    return client.post("/api/uyeler", json={"ad": "Deniz", "soyad": "Er", "email": f"{uuid.uuid4().hex[:8]}@x.com"}).json()["id"]
+
+def _kirala(client, kitap_id):
+    son_teslim = (datetime.utcnow() + timedelta(days=14)).isoformat()
+    return client.post("/api/kiralamalar", json={"kitap_id": kitap_id, "uye_id": _uye(client), "son_teslim_tarihi": son_teslim})
+
+def _indeksi_eskit():
+    """Başka bir worker yazmış gibi kitaplar sürümünü artır - İndeks ön kontrolü devre dışı kalır"""
+    with SessionLocal() as db:
+        counters.surum_artir(db, "kitaplar")
+        db.commit()
+
+def test_ikinci_kiralama_indeks_olmadan_da_reddedilir(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Tek nüsha", "yazar": "Yazar"}).json()["id"]
+    assert _kirala(client, kitap_id).status_code == 200
+
+    _indeksi_eskit()
+    yanit = _kirala(client, kitap_id)
+    assert yanit.status_code == 400
+    assert yanit.json()["detail"] == "Kitap şu anda kiralanabilir değil"
+
+def test_silinmis_kitabin_teslimi_kiralanabilir_sayisini_artirmaz(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Silinecek", "yazar": "Yazar"}).json()["id"]
+    kiralama_id = _kirala(client, kitap_id).json()["id"]
+
+    # Kitap satırı doğrudan silinir - Sayaçlar kitap_silindi ile düşülür (kiralanmış, kiralanabilir değil)
+    with SessionLocal() as db:
+        kitap = db.get(Kitap, kitap_id)
+        counters.kitap_silindi(db, kitap)
+        db.execute(delete(Kitap).where(Kitap.id == kitap_id))
+        db.commit()
+
+    once = client.get("/api/istatistikler").json()
+    assert client.put(f"/api/kiralamalar/{kiralama_id}/teslim").status_code == 200
+    sonra = client.get("/api/istatistikler").json()
+
+    assert sonra["kiralanabilir_kitap"] == once["kiralanabilir_kitap"]
+    assert sonra["aktif_kiralama"] == once["aktif_kiralama"] - 1
+    assert client.get(f"/api/kitaplar/{kitap_id}").status_code == 404
+
+def test_elle_kiralanabilir_yapilan_kiralik_kitap_tekrar_kiralanamaz(client):
+    kitap_id = client.post("/api/kitaplar", json={"baslik": "Düzenlenen", "yazar": "Yazar"}).json()["id"]
+    assert _kirala(client, kitap_id).status_code == 200
+
+    # Düzenleme formu kiralanabilir kutusunu gönderir - Aktif kiralama devam ediyor
+    assert client.put(f"/api/kitaplar/{kitap_id}", json={"baslik": "Düzenlenen", "yazar": "Yazar", "kiralanabilir": True}).status_code == 200
+    yanit = _kirala(client, kitap_id)
+    assert yanit.status_code == 400
+    assert yanit.json()["detail"] == "Kitap zaten kiralanmış"
+
+    aktifler = [k for k in client.get("/api/kiralamalar").json() if k["kitap_id"] == kitap_id and k["durum"] == "aktif"]
+    assert len(aktifler) == 1
@@ -0,0 +1,44 @@
+# Kütüphane Yönetim Sistemi - Açılış Testleri
+# Uygulama aynı veritabanıyla art arda açılabilmeli - Şema hazırlığı idempotent olmalı
+# Her test kendi süreci ve boş veritabanıyla çalışır
+
+import os
+import subprocess
+import sys
+
+from conftest import PROJE_KOKU
+
+ACILIS_KODU = """
+import logging_config, sys
+from pathlib import Path
+logging_config.log_dir = Path(sys.argv[1]) / "logs"
+from fastapi.testclient import TestClient
+import main
+for _ in range(2):
+    with TestClient(main.app) as istemci:
+        assert istemci.get("/api/system/health/live").status_code == 200
+"""
+
+def _iki_kez_ac(klasor, veritabani):
+    ortam = {**os.environ, "DATABASE_URL": f"sqlite:///{veritabani}"}
+    return subprocess.run(
+        [sys.executable, "-c", ACILIS_KODU, str(klasor)],
+        cwd=PROJE_KOKU, env=ortam, capture_output=True, text=True, timeout=120
+    )
+
+def test_bos_veritabaninda_iki_kez_acilir(tmp_path):
+    sonuc = _iki_kez_ac(tmp_path, tmp_path / "bos.db")
+    assert sonuc.returncode == 0, sonuc.stderr[-2000:]
+
+def test_ifade_indeksi_tekrar_olusturulmaz(tmp_path):
+    """lower(email) indeksi reflection'da görünmez - İkinci açılış CREATE INDEX denememeli"""
+    import sqlite3
+
+    veritabani = tmp_path / "mevcut.db"
+    assert _iki_kez_ac(tmp_path, veritabani).returncode == 0
+    sonuc = _iki_kez_ac(tmp_path, veritabani)
+    assert sonuc.returncode == 0, sonuc.stderr[-2000:]
+
+    with sqlite3.connect(veritabani) as conn:
+        indeksler = {ad for (ad,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "ix_uyeler_email_lower" in indeksler